@@ -1,13 +1,31 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from bisect import bisect_right
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from limits.storage import Storage
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse, urljoin
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse, urljoin, urlunparse, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED, TimeoutError as FuturesTimeoutError
+from itertools import chain
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from http.cookiejar import DefaultCookiePolicy
+import codecs
+import heapq
+import json
+import math
 import os
 import re
+import sqlite3
+import tempfile
+import threading
 import time
+import uuid
 
 app = Flask(__name__)
 
@@ -22,409 +40,2195 @@ CORS(app, resources={
     }
 })
 
+# Rate-limit counters live in shared storage so every gunicorn worker (and,
+# with Redis, every host) draws on the same quota. RATELIMIT_STORAGE_URI takes
+# any limits storage URI, e.g. redis://host:6379 or memcached://host:11211
+# (the matching client library must be installed). The default is a SQLite
+# file on local disk, which covers several workers on one host.
+RATELIMIT_DB_PATH = os.environ.get(
+    "RATELIMIT_DB_PATH",
+    os.path.join(tempfile.gettempdir(), "seo-analyzer-ratelimit.sqlite3")
+)
+RATELIMIT_STORAGE_URI = os.environ.get("RATELIMIT_STORAGE_URI", "sqlite://" + RATELIMIT_DB_PATH)
+RATELIMIT_PRUNE_EVERY = 500
+
+
+class SQLiteLimitStorage(Storage):
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri=None, wrap_exceptions=False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = (uri or "").split("://", 1)[-1] or RATELIMIT_DB_PATH
+        self.local = threading.local()
+        self.writes = 0
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def db(self):
+        conn = getattr(self.local, "conn", None)
+
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self.local.conn = conn
+
+        return conn
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        now = time.time()
+        conn = self.db()
+
+        row = conn.execute(
+            "INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "count = CASE WHEN expires_at > ? THEN count + excluded.count ELSE excluded.count END, "
+            "expires_at = CASE WHEN expires_at > ? AND NOT ? THEN expires_at ELSE excluded.expires_at END "
+            "RETURNING count",
+            (key, amount, now + expiry, now, now, bool(elastic_expiry))
+        ).fetchall()[0]
+
+        self.writes += 1
+
+        if self.writes % RATELIMIT_PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+
+        return row[0]
+
+    def get(self, key):
+        row = self.db().execute(
+            "SELECT count FROM rate_limits WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        row = self.db().execute(
+            "SELECT expires_at FROM rate_limits WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+
+        return row[0] if row else time.time()
+
+    def check(self):
+        try:
+            self.db().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        return self.db().execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key):
+        self.db().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+
 # Basic fair-use protection.
 # This helps prevent one person or bot from burning through PageSpeed quota.
+# If the shared store is unreachable, limits fall back to per-worker memory
+# instead of failing requests.
 limiter = Limiter(
     get_remote_address,
     app=app,
     default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://"
+    storage_uri=RATELIMIT_STORAGE_URI,
+    in_memory_fallback_enabled=True
 )
 UA = "Mozilla/5.0 (compatible; DiviDojoSEO/1.0; +https://dividojo.com)"
 TIMEOUT = 10
-LAST_PLACES_DEBUG = {}
 
+# ---------- Timing and metrics ----------
 
-def fetch(url):
-    return requests.get(url, headers={"User-Agent": UA}, timeout=TIMEOUT)
+# Stage timers record into two places: the current request's timing list
+# (returned as a "timings" block when the caller sends "timings": true or
+# ?timings=1) and process-wide histograms exported on /metrics in Prometheus
+# text format. Metrics are per worker process. Work handed to a thread pool
+# is submitted with submit_in_context() so its timings land on the request
+# that caused it. Upstream metrics name only the fixed API hosts below; every
+# scanned or analyzed website is counted under host="site", so the series
+# count stays bounded and /metrics never lists which sites users looked up.
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
 
+REQUEST_TIMINGS = ContextVar("request_timings", default=None)
 
-@app.route("/")
-def home():
-    return "Divi Dojo SEO Analyzer API is running successfully!"
+METRICS_LOCK = threading.Lock()
+STAGE_HISTOGRAMS = {}
+UPSTREAM_HISTOGRAMS = {}
+UPSTREAM_REQUESTS = {}
 
+METRIC_UPSTREAM_HOSTS = {
+    "maps.googleapis.com",
+    "places.googleapis.com",
+    "www.googleapis.com",
+    "api.brevo.com",
+}
 
-@app.route("/analyze", methods=["POST"])
-def analyze():
-    data = request.get_json(force=True)
-    url = (data.get("url") or "").strip()
-    keyword = (data.get("keyword") or "").strip().lower()
 
-    if not url:
-        return jsonify({"error": "Missing URL"}), 400
+def observe_histogram(histograms, key, seconds):
+    histogram = histograms.get(key)
 
-    parsed = urlparse(url)
+    if histogram is None:
+        histogram = histograms[key] = {"buckets": [0] * len(METRIC_BUCKETS), "sum": 0.0, "count": 0}
 
-    if not parsed.scheme:
-        url = "https://" + url
-        parsed = urlparse(url)
+    for i, bound in enumerate(METRIC_BUCKETS):
+        if seconds <= bound:
+            histogram["buckets"][i] += 1
+            break
+
+    histogram["sum"] += seconds
+    histogram["count"] += 1
+
+
+def record_stage(stage, seconds):
+    timings = REQUEST_TIMINGS.get()
+
+    if timings is not None:
+        timings.append((stage, seconds))
+
+    with METRICS_LOCK:
+        observe_histogram(STAGE_HISTOGRAMS, stage, seconds)
+
+
+def record_upstream(host, status, seconds):
+    if host not in METRIC_UPSTREAM_HOSTS:
+        host = "site"
+
+    with METRICS_LOCK:
+        observe_histogram(UPSTREAM_HISTOGRAMS, host, seconds)
+        UPSTREAM_REQUESTS[(host, str(status))] = UPSTREAM_REQUESTS.get((host, str(status)), 0) + 1
+
+
+@contextmanager
+def stage_timer(stage):
+    started = time.perf_counter()
 
     try:
-        r = fetch(url)
-    except Exception as e:
-        return jsonify({"error": f"Fetch failed: {e}"}), 400
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
 
-    if r.status_code != 200:
-        return jsonify({"error": f"Unable to fetch URL (status {r.status_code})"}), 400
 
-    html = r.text
-    soup = BeautifulSoup(html, "html.parser")
+def submit_in_context(executor, fn, *args, **kwargs):
+    return executor.submit(copy_context().run, fn, *args, **kwargs)
 
-    title = (soup.title.string or "").strip() if soup.title and soup.title.string else ""
 
-    md = soup.find("meta", attrs={"name": "description"})
-    description = (md.get("content") or "").strip() if md else ""
+def timings_requested(data):
+    return bool((data or {}).get("timings")) or request.args.get("timings", "").lower() in ("1", "true", "yes")
 
-    h1_tags = [h.get_text(strip=True) for h in soup.find_all("h1")]
 
-    for t in soup(["script", "style", "noscript"]):
-        t.extract()
+def request_timings_summary():
+    timings = REQUEST_TIMINGS.get() or []
+    stages = {}
 
-    text = soup.get_text(separator=" ")
-    words = [w for w in text.split() if w.isalpha() or any(c.isalnum() for c in w)]
-    word_count = len(words)
+    for stage, seconds in list(timings):
+        summary = stages.setdefault(stage, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        summary["count"] += 1
+        summary["total_ms"] += seconds * 1000
+        summary["max_ms"] = max(summary["max_ms"], seconds * 1000)
 
-    imgs = soup.find_all("img")
-    imgs_without_alt = sum(1 for im in imgs if not (im.get("alt") or "").strip())
+    for summary in stages.values():
+        summary["total_ms"] = round(summary["total_ms"], 1)
+        summary["max_ms"] = round(summary["max_ms"], 1)
 
-    viewport = soup.find("meta", attrs={"name": "viewport"})
-    viewport_ok = bool(viewport)
+    return stages
 
-    https_ok = parsed.scheme.lower() == "https"
 
-    base = f"{parsed.scheme}://{parsed.netloc}"
-    robots_ok = False
-    sitemap_ok = False
+def prometheus_labels(**labels):
+    return ",".join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in labels.items()
+    )
+
+
+def prometheus_histogram_lines(name, label, histograms):
+    lines = []
+
+    for key, histogram in sorted(histograms.items()):
+        cumulative = 0
+
+        for bound, count in zip(METRIC_BUCKETS, histogram["buckets"]):
+            cumulative += count
+            lines.append(f"{name}_bucket{{{prometheus_labels(**{label: key, 'le': f'{bound:g}'})}}} {cumulative}")
+
+        lines.append(f"{name}_bucket{{{prometheus_labels(**{label: key, 'le': '+Inf'})}}} {histogram['count']}")
+        lines.append(f"{name}_sum{{{prometheus_labels(**{label: key})}}} {histogram['sum']:.6f}")
+        lines.append(f"{name}_count{{{prometheus_labels(**{label: key})}}} {histogram['count']}")
+
+    return lines
+
+
+def prometheus_metrics():
+    with METRICS_LOCK:
+        lines = [
+            "# HELP seo_stage_duration_seconds Time spent in each processing stage.",
+            "# TYPE seo_stage_duration_seconds histogram"
+        ]
+        lines.extend(prometheus_histogram_lines("seo_stage_duration_seconds", "stage", STAGE_HISTOGRAMS))
+        lines.extend([
+            "# HELP seo_upstream_request_duration_seconds Outbound HTTP request time per upstream host.",
+            "# TYPE seo_upstream_request_duration_seconds histogram"
+        ])
+        lines.extend(prometheus_histogram_lines("seo_upstream_request_duration_seconds", "host", UPSTREAM_HISTOGRAMS))
+        lines.extend([
+            "# HELP seo_upstream_requests_total Outbound HTTP requests per upstream host and status.",
+            "# TYPE seo_upstream_requests_total counter"
+        ])
+
+        for (host, status), count in sorted(UPSTREAM_REQUESTS.items()):
+            lines.append(f"seo_upstream_requests_total{{{prometheus_labels(host=host, status=status)}}} {count}")
+
+    lines.extend([
+        "# HELP seo_google_api_queue_depth Calls waiting for a Google API quota token.",
+        "# TYPE seo_google_api_queue_depth gauge"
+    ])
+    lines.extend(
+        f"seo_google_api_queue_depth{{{prometheus_labels(api=api)}}} {bucket.queue_depth()}"
+        for api, bucket in sorted(GOOGLE_BUCKETS.items())
+    )
+    lines.extend([
+        "# HELP seo_google_api_rate Current allowed Google API request rate per second.",
+        "# TYPE seo_google_api_rate gauge"
+    ])
+    lines.extend(
+        f"seo_google_api_rate{{{prometheus_labels(api=api)}}} {round(bucket.rate, 3)}"
+        for api, bucket in sorted(GOOGLE_BUCKETS.items())
+    )
+    lines.extend([
+        "# HELP seo_google_api_throttled_total Google API calls rejected for quota or rate.",
+        "# TYPE seo_google_api_throttled_total counter"
+    ])
+    lines.extend(
+        f"seo_google_api_throttled_total{{{prometheus_labels(api=api)}}} {bucket.throttled}"
+        for api, bucket in sorted(GOOGLE_BUCKETS.items())
+    )
+
+    return "\n".join(lines) + "\n"
+
+
+@app.before_request
+def start_request_timings():
+    REQUEST_TIMINGS.set([])
+
+
+# Outbound HTTP goes through one pooled, keep-alive client layer. Each thread
+# gets its own Session (with cookies disabled), but every Session mounts the
+# same adapter, so connection pools are shared per host across threads.
+# Retries with backoff only apply to idempotent methods; POSTs are only
+# retried when the connection itself could not be opened. Slow calls whose
+# 5xx answers are real results (PageSpeed reports Lighthouse failures as 500)
+# pass status_retries=False and go through an adapter that only retries
+# connection errors.
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", str(TIMEOUT)))
+HTTP_POOL_HOSTS = int(os.environ.get("HTTP_POOL_HOSTS", "32"))
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "16"))
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", "2"))
+HTTP_RETRY_BACKOFF = float(os.environ.get("HTTP_RETRY_BACKOFF", "0.5"))
+
+
+def build_http_adapter(status_retries=True):
+    retry = Retry(
+        total=HTTP_RETRIES,
+        connect=HTTP_RETRIES,
+        read=0,
+        status=HTTP_RETRIES if status_retries else 0,
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        status_forcelist=[429, 500, 502, 503, 504] if status_retries else [],
+        allowed_methods=["GET", "HEAD", "OPTIONS"],
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+
+    return HTTPAdapter(
+        pool_connections=HTTP_POOL_HOSTS,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=retry
+    )
+
+
+HTTP_ADAPTER = build_http_adapter()
+HTTP_ADAPTER_NO_STATUS_RETRY = build_http_adapter(status_retries=False)
+HTTP_LOCAL = threading.local()
+
+
+def http_session(status_retries=True):
+    name = "session" if status_retries else "session_no_status_retry"
+    session = getattr(HTTP_LOCAL, name, None)
+
+    if session is None:
+        adapter = HTTP_ADAPTER if status_retries else HTTP_ADAPTER_NO_STATUS_RETRY
+        session = requests.Session()
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        setattr(HTTP_LOCAL, name, session)
+
+    return session
+
+
+def send_request(method, url, read_timeout=None, status_retries=True, **kwargs):
+    if read_timeout is None:
+        read_timeout = HTTP_READ_TIMEOUT
+
+    kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT, read_timeout))
+
+    host = (urlparse(url).hostname or "").lower()
+    started = time.perf_counter()
+    status = "error"
+
+    try:
+        response = http_session(status_retries).request(method, url, **kwargs)
+        status = response.status_code
+        return response
+    finally:
+        record_upstream(host, status, time.perf_counter() - started)
+
+
+# Every Google API call (Geocoding, Places New and legacy, Place Details,
+# PageSpeed) waits for a token from that API's bucket before it is sent.
+# Waiters are served by priority: "interactive" requests go ahead of "bulk"
+# work such as lead sweeps and background refreshes (set with
+# REQUEST_PRIORITY). A 429/503 or an OVER_QUERY_LIMIT status pauses the
+# bucket for Retry-After (or an exponential backoff), halves its rate, and
+# the call is retried (urllib3 status retries are turned off for these
+# calls); successes slowly restore the configured rate.
+# GOOGLE_RATE_<API> (requests per second) and GOOGLE_BURST_<API>, e.g.
+# GOOGLE_RATE_PAGESPEED=4, are the limits for the whole host. Buckets live
+# in each worker process, so each one gets the configured rate and burst
+# divided by GOOGLE_QUOTA_WORKERS (defaults to WEB_CONCURRENCY, or 2 to
+# match the Procfile); set it when running a different number of workers.
+GOOGLE_API_ROUTES = [
+    ("maps.googleapis.com", "/maps/api/geocode/", "geocode"),
+    ("maps.googleapis.com", "/maps/api/place/textsearch/", "places_legacy"),
+    ("maps.googleapis.com", "/maps/api/place/details/", "place_details"),
+    ("places.googleapis.com", "/", "places_new"),
+    ("www.googleapis.com", "/pagespeedonline/", "pagespeed"),
+]
+GOOGLE_API_DEFAULT_RATES = {
+    "geocode": 20,
+    "places_legacy": 10,
+    "place_details": 20,
+    "places_new": 10,
+    "pagespeed": 4,
+}
+GOOGLE_QUEUE_TIMEOUT = float(os.environ.get("GOOGLE_QUEUE_TIMEOUT", "30"))
+GOOGLE_THROTTLE_RETRIES = int(os.environ.get("GOOGLE_THROTTLE_RETRIES", "2"))
+GOOGLE_MAX_BACKOFF = float(os.environ.get("GOOGLE_MAX_BACKOFF", "60"))
+GOOGLE_QUOTA_WORKERS = max(1, int(
+    os.environ.get("GOOGLE_QUOTA_WORKERS") or os.environ.get("WEB_CONCURRENCY") or "2"
+))
+
+REQUEST_PRIORITIES = {"interactive": 0, "bulk": 1}
+REQUEST_PRIORITY = ContextVar("request_priority", default="interactive")
+
+
+# Pools that both request handlers and bulk work feed have a separate, smaller
+# bulk twin, so a large sweep queues behind itself instead of in front of
+# interactive requests.
+def executor_for_priority(interactive_executor, bulk_executor):
+    return bulk_executor if REQUEST_PRIORITY.get() == "bulk" else interactive_executor
+
+
+class TokenBucket:
+    def __init__(self, name, rate, burst):
+        self.name = name
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.throttle_streak = 0
+        self.throttled = 0
+        self.waiters = []
+        self.next_ticket = 0
+        self.cond = threading.Condition()
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, priority, timeout):
+        deadline = time.monotonic() + timeout
+
+        with self.cond:
+            ticket = (REQUEST_PRIORITIES.get(priority, 0), self.next_ticket)
+            self.next_ticket += 1
+            heapq.heappush(self.waiters, ticket)
+
+            try:
+                while True:
+                    now = time.monotonic()
+                    self.refill(now)
+
+                    if self.waiters[0] == ticket:
+                        if now >= self.blocked_until and self.tokens >= 1:
+                            self.tokens -= 1
+                            return
+
+                        delay = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+                    else:
+                        delay = deadline - now
+
+                    if now >= deadline:
+                        raise RuntimeError(f"Timed out waiting for {self.name} API quota")
+
+                    self.cond.wait(min(delay, deadline - now))
+
+            finally:
+                self.waiters.remove(ticket)
+                heapq.heapify(self.waiters)
+                self.cond.notify_all()
+
+    def succeeded(self):
+        with self.cond:
+            self.throttle_streak = 0
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.1)
+
+    def throttle(self, retry_after=None):
+        with self.cond:
+            self.throttled += 1
+            self.throttle_streak += 1
+            backoff = retry_after if retry_after is not None else 2 ** (self.throttle_streak - 1)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + min(backoff, GOOGLE_MAX_BACKOFF))
+            self.rate = max(self.base_rate * 0.1, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+    def queue_depth(self):
+        with self.cond:
+            return len(self.waiters)
+
+
+GOOGLE_BUCKETS = {}
+
+for api, default_rate in GOOGLE_API_DEFAULT_RATES.items():
+    rate = float(os.environ.get(f"GOOGLE_RATE_{api.upper()}", str(default_rate)))
+    burst = float(os.environ.get(f"GOOGLE_BURST_{api.upper()}", str(rate)))
+    rate = max(0.1, rate / GOOGLE_QUOTA_WORKERS)
+    burst = max(1.0, burst / GOOGLE_QUOTA_WORKERS)
+    GOOGLE_BUCKETS[api] = TokenBucket(api, rate, burst)
+
+
+def google_api_name(url):
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+
+    for route_host, path_prefix, api in GOOGLE_API_ROUTES:
+        if host == route_host and parsed.path.startswith(path_prefix):
+            return api
+
+    return None
+
+
+def retry_after_seconds(response):
+    value = (response.headers.get("Retry-After") or "").strip()
+
+    if not value:
+        return None
+
+    if value.isdigit():
+        return float(value)
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def google_throttled(response):
+    if response.status_code in (429, 503):
+        return True
+
+    if "maps.googleapis.com" not in response.url or response.status_code != 200:
+        return False
 
     try:
-        rr = requests.head(
-            urljoin(base, "/robots.txt"),
-            headers={"User-Agent": UA},
-            timeout=TIMEOUT,
-            allow_redirects=True
+        return response.json().get("status") == "OVER_QUERY_LIMIT"
+    except ValueError:
+        return False
+
+
+def http_request(method, url, read_timeout=None, **kwargs):
+    api = google_api_name(url)
+
+    if api is None:
+        return send_request(method, url, read_timeout=read_timeout, **kwargs)
+
+    bucket = GOOGLE_BUCKETS[api]
+    # The bucket loop is the only retry layer for Google; urllib3 status
+    # retries underneath it would multiply every throttled call.
+    kwargs.setdefault("status_retries", False)
+
+    for attempt in range(GOOGLE_THROTTLE_RETRIES + 1):
+        with stage_timer("google_quota_wait"):
+            bucket.acquire(REQUEST_PRIORITY.get(), GOOGLE_QUEUE_TIMEOUT)
+
+        response = send_request(method, url, read_timeout=read_timeout, **kwargs)
+
+        if not google_throttled(response):
+            bucket.succeeded()
+            return response
+
+        bucket.throttle(retry_after_seconds(response))
+
+    return response
+
+
+# Small key/value cache on local disk (SQLite), shared by every gunicorn
+# worker on the host and kept across restarts. Entries are grouped by
+# namespace; reads refresh used_at so the oldest-used entries are evicted
+# first once a namespace goes over its max_entries.
+CACHE_DB_PATH = os.environ.get(
+    "CACHE_DB_PATH",
+    os.path.join(tempfile.gettempdir(), "seo-analyzer-cache.sqlite3")
+)
+
+CACHE_DB_LOCAL = threading.local()
+
+
+def cache_db():
+    conn = getattr(CACHE_DB_LOCAL, "conn", None)
+
+    if conn is None:
+        conn = sqlite3.connect(CACHE_DB_PATH, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, used_at REAL NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
         )
-        robots_ok = rr.status_code == 200
-    except Exception:
-        pass
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_entries_lru "
+            "ON cache_entries (namespace, used_at)"
+        )
+        CACHE_DB_LOCAL.conn = conn
+
+    return conn
+
+
+def disk_cache_get(namespace, key, max_age=None):
+    now = time.time()
 
     try:
-        sr = requests.head(
-            urljoin(base, "/sitemap.xml"),
-            headers={"User-Agent": UA},
-            timeout=TIMEOUT,
-            allow_redirects=True
+        conn = cache_db()
+        row = conn.execute(
+            "SELECT value, created_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+
+        if row is None:
+            return None, None
+
+        age = max(0.0, now - row[1])
+
+        if max_age is not None and age > max_age:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            )
+            return None, None
+
+        conn.execute(
+            "UPDATE cache_entries SET used_at = ? WHERE namespace = ? AND key = ?",
+            (now, namespace, key)
         )
-        sitemap_ok = sr.status_code == 200
-    except Exception:
-        pass
 
-    keyword_in_title = bool(keyword and title and keyword in title.lower())
-    keyword_in_desc = bool(keyword and description and keyword in description.lower())
-    keyword_in_h1 = bool(keyword and any(keyword in h1.lower() for h1 in h1_tags))
-    keyword_in_body = bool(keyword and keyword in text.lower())
+        return json.loads(row[0]), age
 
-    keyword_found_in_list = []
+    except (sqlite3.Error, ValueError) as e:
+        print(f"Disk cache read error ({namespace}):", e, flush=True)
+        return None, None
 
-    if keyword:
-        if keyword_in_title:
-            keyword_found_in_list.append("Title")
-        if keyword_in_desc:
-            keyword_found_in_list.append("Meta")
-        if keyword_in_h1:
-            keyword_found_in_list.append("H1")
-        if keyword_in_body:
-            keyword_found_in_list.append("Body")
 
-    score = 0
+def disk_cache_has(namespace, key, max_age=None):
+    try:
+        row = cache_db().execute(
+            "SELECT created_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Disk cache read error ({namespace}):", e, flush=True)
+        return False
 
-    if title:
-        score += 10
-    if description:
-        score += 10
-    if h1_tags:
-        score += 10
+    if row is None:
+        return False
 
-    if keyword_in_title:
-        score += 12
-    if keyword_in_desc:
-        score += 6
-    if keyword_in_h1:
-        score += 6
-    if keyword_in_body:
-        score += 6
+    return max_age is None or time.time() - row[0] <= max_age
 
-    if https_ok:
-        score += 10
-    if viewport_ok:
-        score += 8
-    if robots_ok:
-        score += 6
-    if sitemap_ok:
-        score += 6
 
-    if word_count >= 1200:
-        score += 12
-    elif word_count >= 600:
-        score += 8
-    elif word_count >= 300:
-        score += 4
+def disk_cache_set(namespace, key, value, max_entries=None):
+    now = time.time()
 
-    total_imgs = len(imgs)
+    try:
+        conn = cache_db()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, created_at, used_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), now, now)
+        )
 
-    if total_imgs > 0:
-        covered = total_imgs - imgs_without_alt
-        coverage_ratio = covered / total_imgs
+        if max_entries:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                "SELECT key FROM cache_entries WHERE namespace = ? "
+                "ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (namespace, namespace, int(max_entries))
+            )
 
-        if coverage_ratio >= 0.9:
-            score += 8
-        elif coverage_ratio >= 0.7:
-            score += 4
-        elif coverage_ratio >= 0.5:
-            score += 2
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        print(f"Disk cache write error ({namespace}):", e, flush=True)
 
-    seo_score = max(0, min(100, int(round(score))))
 
-    verdict = (
-        "Excellent ✅" if seo_score >= 85
-        else "Good 👍" if seo_score >= 70
-        else "Needs Improvement ⚠️"
+# Long-running work (speed checks submitted with "async": true) runs on
+# JOB_EXECUTOR. Job state lives in the disk cache so any worker can answer a
+# status poll; updates come from the worker running the job, under JOB_LOCK.
+JOB_TTL = float(os.environ.get("JOB_TTL", str(6 * 3600)))
+JOB_MAX = int(os.environ.get("JOB_MAX", "1000"))
+
+JOB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, int(os.environ.get("JOB_WORKERS", "4"))),
+    thread_name_prefix="job"
+)
+
+JOB_LOCK = threading.Lock()
+
+
+def save_job(job):
+    job["updated_at"] = time.time()
+    disk_cache_set("jobs", job["job_id"], job, max_entries=JOB_MAX)
+
+
+def create_job(kind, **fields):
+    job = dict(
+        fields,
+        job_id=uuid.uuid4().hex,
+        kind=kind,
+        status="queued",
+        created_at=time.time()
     )
+    save_job(job)
 
-    def check_str(ok, yes="✅ Yes", no="❌ No"):
-        return yes if ok else no
+    return job
 
-    title_field = f"✅ Present — {len(title)} chars" if title else "❌ Missing"
-    desc_field = f"✅ Present — {len(description)} chars" if description else "❌ Missing"
-    viewport_field = "✅ Present" if viewport_ok else "❌ Missing"
-    https_field = check_str(https_ok)
-    robots_field = check_str(robots_ok, yes="✅ Found", no="❌ Not Found")
-    sitemap_field = check_str(sitemap_ok, yes="✅ Found", no="❌ Not Found")
-    kw_where = ", ".join(keyword_found_in_list) if keyword_found_in_list else "Not Found"
 
-    payload = {
-        "URL": url,
-        "SEO Score (0–100)": seo_score,
-        "Verdict": verdict,
-        "Estimated Monthly Visitors": "N/A",
-        "Backlinks (Referring Domains)": "N/A",
-        "Title": title_field,
-        "Title Tag": title or "",
-        "Meta Description": desc_field,
-        "H1 Count": len(h1_tags),
-        "Word Count": word_count,
-        "Images Without ALT": imgs_without_alt,
-        "Viewport (Mobile Friendly)": viewport_field,
-        "HTTPS Enabled": https_field,
-        "robots.txt Found": robots_field,
-        "Sitemap Found": sitemap_field,
-        "Keyword Found In": kw_where
-    }
+def load_job(job_id, kind=None):
+    job, age = disk_cache_get("jobs", job_id, max_age=JOB_TTL)
 
-    return jsonify(payload)
+    if not job or (kind and job.get("kind") != kind):
+        return None
 
+    return job
 
-# ---------- Existing Business Lead Generator ----------
 
-CHAIN_HINTS = [
-    "mcdonald", "burger king", "wendy", "taco bell", "subway", "starbucks",
-    "dunkin", "chipotle", "panera", "domino", "pizza hut", "papa john",
-    "walmart", "target", "costco", "sam's club", "walgreens", "cvs",
-    "publix", "aldi", "whole foods", "home depot", "lowe", "best buy",
-    "chase", "bank of america", "wells fargo", "truist", "td bank",
-    "anytime fitness", "planet fitness", "orange theory", "orangetheory",
-    "la fitness", "crunch fitness", "massage envy", "hand and stone",
-    "great clips", "sport clips", "supercuts", "the ups store",
-    "state farm", "allstate", "geico", "farmers insurance",
-    "marriott", "hilton", "hyatt", "hampton inn", "holiday inn"
-]
+def update_job(job_id, **fields):
+    with JOB_LOCK:
+        job = load_job(job_id)
+
+        if job:
+            job.update(fields)
+            save_job(job)
+
+        return job
+
+
+# robots.txt / sitemap.xml probes are started alongside the main page fetch
+# and cached per origin for SITE_PROBE_TTL seconds. The cache holds futures,
+# so concurrent analyses of the same origin share one in-flight probe.
+# Probes started at "bulk" priority run on their own pool, so sweep scans
+# cannot fill the pool that /analyze and interactive lead scans wait on.
+SITE_PROBE_PATHS = {
+    "robots": "/robots.txt",
+    "sitemap": "/sitemap.xml"
+}
+SITE_PROBE_TTL = float(os.environ.get("SITE_PROBE_TTL", "3600"))
+SITE_PROBE_CACHE_MAX = int(os.environ.get("SITE_PROBE_CACHE_MAX", "2048"))
+
+SITE_PROBE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(2, int(os.environ.get("SITE_PROBE_WORKERS", "8"))),
+    thread_name_prefix="site-probe"
+)
+SITE_PROBE_BULK_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(2, int(os.environ.get("SITE_PROBE_BULK_WORKERS", "4"))),
+    thread_name_prefix="site-probe-bulk"
+)
+
+SITE_PROBE_CACHE = {}
+SITE_PROBE_CACHE_LOCK = threading.Lock()
+
+
+def site_origin(url):
+    parsed = urlparse(url)
+
+    return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+
+def probe_site_path(origin, path):
+    try:
+        with stage_timer("site_probe"):
+            r = http_request(
+                "HEAD",
+                urljoin(origin, path),
+                headers={"User-Agent": UA},
+                allow_redirects=True
+            )
+        return r.status_code == 200
+    except Exception:
+        return False
+
+
+def prune_site_probe_cache(now):
+    for origin, (expires_at, probes) in list(SITE_PROBE_CACHE.items()):
+        if expires_at <= now:
+            del SITE_PROBE_CACHE[origin]
+
+    while len(SITE_PROBE_CACHE) > SITE_PROBE_CACHE_MAX:
+        del SITE_PROBE_CACHE[next(iter(SITE_PROBE_CACHE))]
+
+
+def start_site_probes(url):
+    origin = site_origin(url)
+    now = time.monotonic()
+
+    with SITE_PROBE_CACHE_LOCK:
+        entry = SITE_PROBE_CACHE.get(origin)
+
+        if entry is None or entry[0] <= now:
+            executor = executor_for_priority(SITE_PROBE_EXECUTOR, SITE_PROBE_BULK_EXECUTOR)
+            probes = {
+                name: submit_in_context(executor, probe_site_path, origin, path)
+                for name, path in SITE_PROBE_PATHS.items()
+            }
+            SITE_PROBE_CACHE[origin] = (now + SITE_PROBE_TTL, probes)
+
+            if len(SITE_PROBE_CACHE) > SITE_PROBE_CACHE_MAX:
+                prune_site_probe_cache(now)
+
+            return probes
+
+        return entry[1]
+
+
+# ---------- Page signal extraction ----------
+
+# Everything analyze() and scan_business_website() read from a page is
+# collected in one pass over the parser events, without building a tree.
+# Element nesting follows the same rules as BeautifulSoup's html.parser
+# builder: void tags close immediately and an end tag closes everything
+# opened after the most recent matching start tag.
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+    "link", "menuitem", "meta", "param", "source", "track", "wbr",
+    "basefont", "bgsound", "command", "frame", "image", "isindex",
+    "nextid", "spacer"
+}
+
+HIDDEN_TEXT_TAGS = {"script", "style", "noscript", "template"}
+
+# BeautifulSoup's get_text() skips strings inside these tags but keeps
+# <noscript> text, so H1 text follows the same rule.
+NON_TEXT_STRING_TAGS = {"script", "style", "template"}
+
+# A footer region is a <footer> element or an element whose id or one of
+# whose classes is exactly one of these names. <html> and <body> never open
+# one (themes such as Divi put "et_pb_footer_columns4" on <body>). When a
+# page has several, footer_text is the one that closed last.
+FOOTER_NAMES = {"footer", "site-footer", "site_footer", "main-footer", "page-footer", "colophon"}
+FOOTER_EXCLUDED_TAGS = {"html", "body"}
+
+
+class PageSignalParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.open_tags = []
+        self.open_counts = {}
+        self.hidden_depth = 0
+        self.non_text_depth = 0
+        self.title_parts = None
+        self.title_closed = False
+        self.title_has_children = False
+        self.h1_open = []
+        self.text_parts = []
+        self.text_words = 0
+        self.head_closed = False
+        self.footer_open = []
+        self.footer_regions = []
+
+        self.title = ""
+        self.description = None
+        self.viewport = False
+        self.canonical = False
+        self.schema_scripts = 0
+        self.h1_tags = []
+        self.img_count = 0
+        self.imgs_without_alt = 0
+        self.tel_links = 0
+        self.mail_links = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+
+        if tag == "body":
+            self.head_closed = True
+
+        if self.title_parts is not None and not self.title_closed:
+            self.title_has_children = True
+
+        if tag == "meta":
+            name = (attrs.get("name") or "").strip().lower()
+
+            if name == "description" and self.description is None:
+                self.description = (attrs.get("content") or "").strip()
+            elif name == "viewport":
+                self.viewport = True
+
+        elif tag == "link":
+            if "canonical" in (attrs.get("rel") or "").lower().split():
+                self.canonical = True
+
+        elif tag == "img":
+            self.img_count += 1
+
+            if not (attrs.get("alt") or "").strip():
+                self.imgs_without_alt += 1
+
+        elif tag == "a":
+            href = (attrs.get("href") or "").lower()
+
+            if href.startswith("tel:"):
+                self.tel_links += 1
+            elif href.startswith("mailto:"):
+                self.mail_links += 1
+
+        elif tag == "script":
+            if (attrs.get("type") or "").strip().lower() == "application/ld+json":
+                self.schema_scripts += 1
+
+        elif tag == "title" and self.title_parts is None:
+            self.title_parts = []
+
+        elif tag == "h1":
+            self.h1_tags.append("")
+            self.h1_open.append((len(self.open_tags), len(self.h1_tags) - 1, []))
+
+        if tag in VOID_TAGS:
+            return
+
+        if is_footer_element(tag, attrs):
+            self.footer_open.append((len(self.open_tags), []))
+
+        self.open_tags.append(tag)
+        self.open_counts[tag] = self.open_counts.get(tag, 0) + 1
+
+        if tag in HIDDEN_TEXT_TAGS:
+            self.hidden_depth += 1
+
+        if tag in NON_TEXT_STRING_TAGS:
+            self.non_text_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.head_closed = True
+
+        if not self.open_counts.get(tag):
+            return
+
+        while self.open_tags:
+            closed = self.open_tags.pop()
+            self.open_counts[closed] -= 1
+
+            if closed in HIDDEN_TEXT_TAGS:
+                self.hidden_depth -= 1
+
+            if closed in NON_TEXT_STRING_TAGS:
+                self.non_text_depth -= 1
+
+            if closed == "title" and self.title_parts is not None:
+                self.title_closed = True
+
+            while self.h1_open and self.h1_open[-1][0] >= len(self.open_tags):
+                depth, index, parts = self.h1_open.pop()
+                self.h1_tags[index] = "".join(parts)
+
+            while self.footer_open and self.footer_open[-1][0] >= len(self.open_tags):
+                self.footer_regions.append(self.footer_open.pop()[1])
+
+            if closed == tag:
+                break
+
+    def handle_data(self, data):
+        if self.title_parts is not None and not self.title_closed:
+            self.title_parts.append(data)
+
+        stripped = data.strip()
+
+        if not stripped:
+            return
+
+        if not self.non_text_depth:
+            for depth, index, parts in self.h1_open:
+                parts.append(stripped)
+
+        if not self.hidden_depth:
+            self.text_parts.append(stripped)
+            self.text_words += len(stripped.split())
+
+            for depth, parts in self.footer_open:
+                parts.append(stripped)
+
+    def has_metadata(self, min_words):
+        return self.head_closed and self.text_words >= min_words
+
+    def signals(self):
+        for depth, index, parts in self.h1_open:
+            self.h1_tags[index] = "".join(parts)
+
+        title = ""
+
+        if self.title_parts and not self.title_has_children:
+            title = "".join(self.title_parts).strip()
+
+        text = " ".join(self.text_parts)
+        footer_parts = []
+
+        for parts in self.footer_regions + [parts for depth, parts in reversed(self.footer_open)]:
+            if parts:
+                footer_parts = parts
+
+        return {
+            "title": title,
+            "description": self.description or "",
+            "viewport": self.viewport,
+            "canonical": self.canonical,
+            "schema_scripts": self.schema_scripts,
+            "h1_tags": list(self.h1_tags),
+            "img_count": self.img_count,
+            "imgs_without_alt": self.imgs_without_alt,
+            "tel_links": self.tel_links,
+            "mail_links": self.mail_links,
+            "text": text,
+            "footer_text": " ".join(footer_parts),
+            "word_count": count_words(text)
+        }
+
+
+def is_footer_element(tag, attrs):
+    if tag == "footer":
+        return True
+
+    if tag in FOOTER_EXCLUDED_TAGS:
+        return False
+
+    names = (attrs.get("class") or "").lower().split()
+    names.append((attrs.get("id") or "").strip().lower())
+
+    return any(name in FOOTER_NAMES for name in names)
+
+
+def count_words(text):
+    return len([w for w in text.split() if w.isalpha() or any(c.isalnum() for c in w)])
+
+
+def extract_page_signals(html):
+    parser = PageSignalParser()
+    parser.feed(html or "")
+    parser.close()
+
+    return parser.signals()
+
+
+# Pages are streamed into the parser as they arrive and reading stops at
+# FETCH_MAX_BYTES. With metadata_only=True reading also stops once </head>
+# has been seen and the body has produced LEAD_SCAN_METADATA_WORDS words,
+# which is the top word-count tier scan_business_website() scores on.
+# Either cut sets page["truncated"]; callers then treat "not found" results
+# for body content (phone links, H1s, footer years...) as unknown.
+FETCH_MAX_BYTES = int(os.environ.get("FETCH_MAX_BYTES", str(3 * 1024 * 1024)))
+FETCH_CHUNK_SIZE = 64 * 1024
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml", "text/plain"}
+LEAD_SCAN_METADATA_ONLY = os.environ.get("LEAD_SCAN_METADATA_ONLY", "").strip().lower() in ("1", "true", "yes")
+LEAD_SCAN_METADATA_WORDS = int(os.environ.get("LEAD_SCAN_METADATA_WORDS", "800"))
+
+
+def response_encoding(headers):
+    match = re.search(r"charset=[\"']?([\w.:-]+)", headers.get("Content-Type") or "", re.I)
+
+    if match:
+        try:
+            return codecs.lookup(match.group(1)).name
+        except LookupError:
+            pass
+
+    return "utf-8"
+
+
+def fetch(url, metadata_only=False, max_bytes=None, headers=None):
+    max_bytes = FETCH_MAX_BYTES if max_bytes is None else max_bytes
+    started = time.perf_counter()
+    parse_seconds = 0.0
+
+    r = http_request("GET", url, headers=dict(headers or {}, **{"User-Agent": UA}), stream=True)
+
+    with r:
+        content_type = (r.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+
+        page = {
+            "status_code": r.status_code,
+            "headers": r.headers,
+            "content_type": content_type,
+            "signals": None,
+            "bytes_read": 0,
+            "truncated": False
+        }
+
+        if r.status_code == 304 or r.status_code >= 400 or (content_type and content_type not in HTML_CONTENT_TYPES):
+            record_stage("page_fetch", time.perf_counter() - started)
+            return page
+
+        decoder = codecs.getincrementaldecoder(response_encoding(r.headers))(errors="replace")
+        parser = PageSignalParser()
+
+        for chunk in r.iter_content(FETCH_CHUNK_SIZE):
+            remaining = max_bytes - page["bytes_read"]
+
+            if len(chunk) > remaining:
+                chunk = chunk[:remaining]
+                page["truncated"] = True
+
+            page["bytes_read"] += len(chunk)
+            parse_started = time.perf_counter()
+            parser.feed(decoder.decode(chunk))
+            parse_seconds += time.perf_counter() - parse_started
+
+            if page["truncated"]:
+                break
+
+            if metadata_only and parser.has_metadata(LEAD_SCAN_METADATA_WORDS):
+                page["truncated"] = True
+                break
+
+        parse_started = time.perf_counter()
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+        page["signals"] = parser.signals()
+        parse_seconds += time.perf_counter() - parse_started
+
+    record_stage("page_parse", parse_seconds)
+    record_stage("page_fetch", time.perf_counter() - started - parse_seconds)
+
+    return page
+
+
+def is_html_page(page):
+    return not page["content_type"] or page["content_type"] in HTML_CONTENT_TYPES
+
+
+# ---------- SEO Analyzer ----------
+
+@app.route("/")
+def home():
+    return "Divi Dojo SEO Analyzer API is running successfully!"
+
+
+# /metrics needs "Authorization: Bearer <METRICS_TOKEN>". Without a token
+# configured it only answers requests from the local host.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "").strip()
+METRICS_LOCAL_ADDRS = {"127.0.0.1", "::1"}
+
+
+def metrics_allowed():
+    if METRICS_TOKEN:
+        return request.headers.get("Authorization", "") == f"Bearer {METRICS_TOKEN}"
+
+    return request.remote_addr in METRICS_LOCAL_ADDRS and "X-Forwarded-For" not in request.headers
+
+
+@app.route("/metrics", methods=["GET"])
+@limiter.exempt
+def metrics():
+    if not metrics_allowed():
+        return jsonify({"error": "Unauthorized"}), 401
+
+    return Response(prometheus_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+# Extra keywords are matched in one pass: title, meta description, H1s and
+# body text are lowercased once into a single buffer and run through a
+# KeywordMatcher, so each additional keyword costs almost nothing after the
+# fetch. The first keyword still drives the score.
+ANALYZE_MAX_KEYWORDS = max(1, int(os.environ.get("ANALYZE_MAX_KEYWORDS", "50")))
+
+KEYWORD_SECTION_SEPARATOR = "\x00"
+
+
+def normalize_keywords(keyword="", keywords=None):
+    if isinstance(keywords, str):
+        keywords = re.split(r"[,\n]", keywords)
+    elif not isinstance(keywords, list):
+        keywords = []
+
+    cleaned = [str(k).strip().lower() for k in [keyword or ""] + keywords]
+
+    return list(dict.fromkeys(k for k in cleaned if k))[:ANALYZE_MAX_KEYWORDS]
+
+
+def match_keywords(page, keywords):
+    # Each section is lowercased before offsets are taken: some characters
+    # ("İ") grow when lowercased, which would shift every later offset.
+    sections = [("Title", page["title"] or ""), ("Meta", page["description"] or "")]
+    sections.extend(("H1", h1) for h1 in page["h1_tags"])
+    sections.append(("Body", page["text"] or ""))
+    sections = [(name, value.lower()) for name, value in sections]
+
+    starts = []
+    offset = 0
+
+    for _, value in sections:
+        starts.append(offset)
+        offset += len(value) + len(KEYWORD_SECTION_SEPARATOR)
+
+    buffer = KEYWORD_SECTION_SEPARATOR.join(value for _, value in sections)
+    body_start = starts[-1]
+
+    matcher = KeywordMatcher(keywords)
+    found_in = [set() for _ in matcher.keywords]
+    counts = [0] * len(matcher.keywords)
+    next_free = [body_start] * len(matcher.keywords)
+
+    for end, index in matcher.iter_matches(buffer):
+        start = end - len(matcher.keywords[index])
+        found_in[index].add(sections[bisect_right(starts, start) - 1][0])
+
+        if start >= next_free[index]:
+            counts[index] += 1
+            next_free[index] = end
+
+    word_count = page["word_count"]
+    matches = {}
+
+    for index, keyword in enumerate(matcher.keywords):
+        density = counts[index] * len(keyword.split()) / word_count * 100 if word_count else 0.0
+
+        matches[keyword] = {
+            "found_in": [name for name in ("Title", "Meta", "H1", "Body") if name in found_in[index]],
+            "count": counts[index],
+            "density": round(density, 2)
+        }
+
+    return matches
+
+
+def analyze_url(url, keyword="", keywords=None):
+    url = (url or "").strip()
+    keywords = normalize_keywords(keyword, keywords)
+    keyword = keywords[0] if keywords else ""
+
+    if not url:
+        return None, "Missing URL"
+
+    parsed = urlparse(url)
+
+    if not parsed.scheme:
+        url = "https://" + url
+        parsed = urlparse(url)
+
+    probes = start_site_probes(url)
+
+    try:
+        fetched = fetch(url)
+    except Exception as e:
+        return None, f"Fetch failed: {e}"
+
+    if fetched["status_code"] != 200:
+        return None, f"Unable to fetch URL (status {fetched['status_code']})"
+
+    if not is_html_page(fetched):
+        return None, f"URL did not return an HTML page ({fetched['content_type']})"
+
+    page = fetched["signals"]
+
+    title = page["title"]
+    description = page["description"]
+    h1_tags = page["h1_tags"]
+    word_count = page["word_count"]
+    imgs_without_alt = page["imgs_without_alt"]
+    viewport_ok = page["viewport"]
+
+    https_ok = parsed.scheme.lower() == "https"
+
+    robots_ok = probes["robots"].result()
+    sitemap_ok = probes["sitemap"].result()
+
+    keyword_matches = match_keywords(page, keywords) if keywords else {}
+    keyword_found_in_list = keyword_matches[keyword]["found_in"] if keyword else []
+
+    keyword_in_title = "Title" in keyword_found_in_list
+    keyword_in_desc = "Meta" in keyword_found_in_list
+    keyword_in_h1 = "H1" in keyword_found_in_list
+    keyword_in_body = "Body" in keyword_found_in_list
+
+    score = 0
+
+    if title:
+        score += 10
+    if description:
+        score += 10
+    if h1_tags:
+        score += 10
+
+    if keyword_in_title:
+        score += 12
+    if keyword_in_desc:
+        score += 6
+    if keyword_in_h1:
+        score += 6
+    if keyword_in_body:
+        score += 6
+
+    if https_ok:
+        score += 10
+    if viewport_ok:
+        score += 8
+    if robots_ok:
+        score += 6
+    if sitemap_ok:
+        score += 6
+
+    if word_count >= 1200:
+        score += 12
+    elif word_count >= 600:
+        score += 8
+    elif word_count >= 300:
+        score += 4
+
+    total_imgs = page["img_count"]
+
+    if total_imgs > 0:
+        covered = total_imgs - imgs_without_alt
+        coverage_ratio = covered / total_imgs
+
+        if coverage_ratio >= 0.9:
+            score += 8
+        elif coverage_ratio >= 0.7:
+            score += 4
+        elif coverage_ratio >= 0.5:
+            score += 2
+
+    seo_score = max(0, min(100, int(round(score))))
+
+    verdict = (
+        "Excellent ✅" if seo_score >= 85
+        else "Good 👍" if seo_score >= 70
+        else "Needs Improvement ⚠️"
+    )
+
+    def check_str(ok, yes="✅ Yes", no="❌ No"):
+        return yes if ok else no
+
+    title_field = f"✅ Present — {len(title)} chars" if title else "❌ Missing"
+    desc_field = f"✅ Present — {len(description)} chars" if description else "❌ Missing"
+    viewport_field = "✅ Present" if viewport_ok else "❌ Missing"
+    https_field = check_str(https_ok)
+    robots_field = check_str(robots_ok, yes="✅ Found", no="❌ Not Found")
+    sitemap_field = check_str(sitemap_ok, yes="✅ Found", no="❌ Not Found")
+    kw_where = ", ".join(keyword_found_in_list) if keyword_found_in_list else "Not Found"
+
+    payload = {
+        "URL": url,
+        "SEO Score (0–100)": seo_score,
+        "Verdict": verdict,
+        "Estimated Monthly Visitors": "N/A",
+        "Backlinks (Referring Domains)": "N/A",
+        "Title": title_field,
+        "Title Tag": title or "",
+        "Meta Description": desc_field,
+        "H1 Count": len(h1_tags),
+        "Word Count": word_count,
+        "Images Without ALT": imgs_without_alt,
+        "Viewport (Mobile Friendly)": viewport_field,
+        "HTTPS Enabled": https_field,
+        "robots.txt Found": robots_field,
+        "Sitemap Found": sitemap_field,
+        "Keyword Found In": kw_where
+    }
+
+    if len(keywords) > 1:
+        payload["Keywords"] = [
+            {
+                "Keyword": kw,
+                "Found In": ", ".join(match["found_in"]) if match["found_in"] else "Not Found",
+                "Occurrences": match["count"],
+                "Density (%)": match["density"]
+            }
+            for kw, match in keyword_matches.items()
+        ]
+
+    if fetched["truncated"]:
+        payload["Page Truncated"] = (
+            f"⚠️ Only the first {(fetched['bytes_read'] + 1023) // 1024} KB were read; "
+            "body counts may be incomplete"
+        )
+
+    return payload, None
+
+
+@app.route("/analyze", methods=["POST"])
+def analyze():
+    data = request.get_json(force=True)
+    payload, error = analyze_url(data.get("url"), data.get("keyword"), data.get("keywords"))
+
+    if error:
+        return jsonify({"error": error}), 400
+
+    if timings_requested(data):
+        payload["timings"] = request_timings_summary()
+
+    return jsonify(payload)
+
+
+# Batch analysis runs each item through analyze_url() on a shared pool. Items
+# share the keep-alive session pools and the per-origin robots/sitemap probe
+# cache, so several pages on one site cost one pair of probes. Fetches to any
+# single host go through the same per-host slots as lead scans. Each item
+# counts against the caller's rate limit.
+ANALYZE_BATCH_MAX = max(1, int(os.environ.get("ANALYZE_BATCH_MAX", "25")))
+ANALYZE_BATCH_WORKERS = max(1, int(os.environ.get("ANALYZE_BATCH_WORKERS", "6")))
+
+ANALYZE_BATCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=ANALYZE_BATCH_WORKERS,
+    thread_name_prefix="analyze-batch"
+)
+
+
+def analyze_batch_items(data):
+    items = data.get("items") if isinstance(data, dict) else None
+
+    if not isinstance(items, list):
+        return []
+
+    return items[:ANALYZE_BATCH_MAX]
+
+
+def analyze_batch_cost():
+    data = request.get_json(force=True, silent=True)
+
+    return max(1, len(analyze_batch_items(data)))
+
+
+def analyze_url_politely(url, keyword, keywords=None):
+    with host_scan_slot(url):
+        return analyze_url(url, keyword, keywords)
+
+
+@app.route("/analyze/batch", methods=["POST"])
+@limiter.limit("200 per day; 50 per hour", cost=analyze_batch_cost)
+def analyze_batch():
+    data = request.get_json(force=True)
+    items = data.get("items")
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Missing items"}), 400
+
+    if len(items) > ANALYZE_BATCH_MAX:
+        return jsonify({"error": f"Too many items (max {ANALYZE_BATCH_MAX})"}), 400
+
+    default_keyword = data.get("keyword") or ""
+    default_keywords = data.get("keywords")
+    futures = []
+
+    for item in items:
+        if isinstance(item, str):
+            item = {"url": item}
+        elif not isinstance(item, dict):
+            item = {}
+
+        url = str(item.get("url") or "")
+        keyword = str(item.get("keyword") or default_keyword)
+        keywords = item.get("keywords", default_keywords)
+        futures.append((url, submit_in_context(ANALYZE_BATCH_EXECUTOR, analyze_url_politely, url, keyword, keywords)))
+
+    results = []
+    failed = 0
+
+    for index, (url, future) in enumerate(futures):
+        try:
+            payload, error = future.result()
+        except Exception as e:
+            payload, error = None, f"Analysis failed: {e}"
+
+        if error:
+            failed += 1
+            results.append({"index": index, "url": url, "ok": False, "error": error})
+        else:
+            results.append({"index": index, "url": url, "ok": True, "result": payload})
+
+    response = {
+        "count": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": results
+    }
+
+    if timings_requested(data):
+        response["timings"] = request_timings_summary()
+
+    return jsonify(response)
+
+
+# ---------- Existing Business Lead Generator ----------
+
+CHAIN_HINTS = [
+    "mcdonald", "burger king", "wendy", "taco bell", "subway", "starbucks",
+    "dunkin", "chipotle", "panera", "domino", "pizza hut", "papa john",
+    "walmart", "target", "costco", "sam's club", "walgreens", "cvs",
+    "publix", "aldi", "whole foods", "home depot", "lowe", "best buy",
+    "chase", "bank of america", "wells fargo", "truist", "td bank",
+    "anytime fitness", "planet fitness", "orange theory", "orangetheory",
+    "la fitness", "crunch fitness", "massage envy", "hand and stone",
+    "great clips", "sport clips", "supercuts", "the ups store",
+    "state farm", "allstate", "geico", "farmers insurance",
+    "marriott", "hilton", "hyatt", "hampton inn", "holiday inn"
+]
+
+DIRECTORY_DOMAINS = [
+    "facebook.com", "instagram.com", "linktr.ee", "yelp.com", "square.site",
+    "sites.google.com", "business.site", "wixsite.com", "godaddysites.com",
+    "booking.com", "opentable.com", "toasttab.com", "clover.com",
+    "mindbodyonline.com", "vagaro.com", "schedulicity.com"
+]
+
+# Extra chain brands and directory hosts can be loaded from plain text files
+# (one entry per line, "#" comments allowed) named by CHAIN_HINTS_FILE and
+# DIRECTORY_DOMAINS_FILE. Chain hints are compiled once at startup into an
+# Aho-Corasick automaton and directory hosts into a domain-suffix set, so
+# lookup cost does not grow with the number of entries.
+def load_list_file(path):
+    if not path:
+        return []
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = [line.split("#", 1)[0].strip().lower() for line in f]
+    except OSError as e:
+        print(f"Could not load list file {path}:", e, flush=True)
+        return []
+
+    return [line for line in lines if line]
+
+
+class KeywordMatcher:
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(k for k in keywords if k))
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+
+            for ch in keyword:
+                next_state = self.goto[state].get(ch)
+
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][ch] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+
+                state = next_state
+
+            self.output[state] = self.output[state] + (index,)
+
+        queue = list(self.goto[0].values())
+
+        for state in queue:
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+
+                self.fail[next_state] = self.goto[fallback].get(ch, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def iter_matches(self, text):
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        state = 0
+
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+
+            state = goto[state].get(ch, 0)
+
+            for index in output[state]:
+                yield position + 1, index
+
+    def search(self, text):
+        for end, index in self.iter_matches(text):
+            return self.keywords[index]
+
+        return None
+
+
+def build_domain_index(domains):
+    return frozenset(d.strip().lower().strip(".") for d in domains if d and d.strip())
+
+
+def host_in_domain_index(host, index):
+    labels = host.lower().strip(".").split(".")
+
+    return any(".".join(labels[i:]) in index for i in range(len(labels)))
+
+
+CHAIN_HINTS.extend(load_list_file(os.environ.get("CHAIN_HINTS_FILE", "")))
+DIRECTORY_DOMAINS.extend(load_list_file(os.environ.get("DIRECTORY_DOMAINS_FILE", "")))
+
+CHAIN_MATCHER = KeywordMatcher(CHAIN_HINTS)
+CHAIN_HOST_MATCHER = KeywordMatcher([hint.replace(" ", "") for hint in CHAIN_HINTS])
+DIRECTORY_DOMAIN_INDEX = build_domain_index(DIRECTORY_DOMAINS)
+
+HIGH_VALUE_CATEGORIES = [
+    "med spa", "medical spa", "dentist", "chiropractor", "attorney",
+    "law firm", "roofing", "roofer", "hvac", "plumber", "electrician",
+    "contractor", "remodeler", "interior designer", "landscaper",
+    "pool service", "pest control", "veterinarian", "physical therapy",
+    "wellness", "salon", "fitness", "senior care", "mobility"
+]
+
+
+def google_api_key():
+    return os.environ.get("GOOGLE_PLACES_API_KEY", "").strip()
+
+
+def google_get(endpoint, params):
+    key = google_api_key()
+
+    if not key:
+        raise RuntimeError("GOOGLE_PLACES_API_KEY is not set")
+
+    params["key"] = key
+    response = http_request("GET", endpoint, params=params)
+    response.raise_for_status()
+
+    return response.json()
+
+
+# Markets repeat constantly ("St. Petersburg, FL" is the default), so
+# geocodes are kept in the disk cache under a punctuation/case-insensitive key.
+GEOCODE_CACHE_TTL = float(os.environ.get("GEOCODE_CACHE_TTL", str(30 * 24 * 3600)))
+GEOCODE_CACHE_MAX = int(os.environ.get("GEOCODE_CACHE_MAX", "5000"))
+
+
+def normalize_market(market):
+    return " ".join(re.sub(r"[^\w\s]", " ", (market or "").lower()).split())
+
+
+def geocode_market(market):
+    cache_key = normalize_market(market)
+    cached, age = disk_cache_get("geocode", cache_key, max_age=GEOCODE_CACHE_TTL)
+
+    if cached:
+        return cached[0], cached[1]
+
+    with stage_timer("geocode"):
+        data = google_get(
+            "https://maps.googleapis.com/maps/api/geocode/json",
+            {"address": market}
+        )
+
+    if data.get("status") != "OK" or not data.get("results"):
+        raise RuntimeError(f"Could not geocode market. Status: {data.get('status')}")
+
+    loc = data["results"][0]["geometry"]["location"]
+    disk_cache_set("geocode", cache_key, [loc["lat"], loc["lng"]], max_entries=GEOCODE_CACHE_MAX)
+
+    return loc["lat"], loc["lng"]
+
+
+def new_places_debug(market, category):
+    return {
+        "query": f"{category} in {market}",
+        "method_used": "",
+        "new_location_count": 0,
+        "new_no_location_count": 0,
+        "legacy_count": 0,
+        "legacy_status": "",
+        "legacy_error_message": "",
+        "last_error": ""
+    }
+
+
+def convert_new_places(places):
+    results = []
+
+    for p in places:
+        results.append({
+            "place_id": p.get("id"),
+            "_new_place_details": {
+                "name": (p.get("displayName") or {}).get("text", ""),
+                "formatted_address": p.get("formattedAddress", ""),
+                "formatted_phone_number": p.get("nationalPhoneNumber", ""),
+                "international_phone_number": p.get("internationalPhoneNumber", ""),
+                "website": p.get("websiteUri", ""),
+                "rating": p.get("rating", 0),
+                "user_ratings_total": p.get("userRatingCount", 0),
+                "types": p.get("types", []),
+                "url": p.get("googleMapsUri", ""),
+                "business_status": p.get("businessStatus", "")
+            }
+        })
+
+    return results
+
+
+def new_places_headers(key):
+    return {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": key,
+        "X-Goog-FieldMask": (
+            "places.id,"
+            "places.displayName,"
+            "places.formattedAddress,"
+            "places.nationalPhoneNumber,"
+            "places.internationalPhoneNumber,"
+            "places.websiteUri,"
+            "places.rating,"
+            "places.userRatingCount,"
+            "places.googleMapsUri,"
+            "places.businessStatus,"
+            "places.types"
+        )
+    }
+
+
+def places_radius_meters(radius_miles):
+    return max(1000, min(int(float(radius_miles) * 1609.34), 50000))
+
+
+# Tiled mode covers the search circle with a hex grid of smaller circles,
+# each searched with a location restriction to the tile's bounding box (a
+# bias alone lets every tile return the same prominent places), so a dense
+# market can return more than one query's 20 results. Requests still default
+# to 20 results; callers pass "limit" (up to PLACES_TILE_MAX_RESULTS) to get
+# more, since every result is a website scan in the same request. Tiles run
+# ring by ring (center first) on PLACES_TILE_EXECUTOR and are merged by
+# place_id. Tiling stops early when a
+# ring returns no full pages (the area is not saturated) or finds fewer than
+# PLACES_TILE_MIN_NEW unseen places per tile.
+PLACES_TILE_SPLIT = max(1.0, float(os.environ.get("PLACES_TILE_SPLIT", "3")))
+PLACES_TILE_MIN_NEW = float(os.environ.get("PLACES_TILE_MIN_NEW", "3"))
+PLACES_TILE_MAX_RESULTS = max(20, int(os.environ.get("PLACES_TILE_MAX_RESULTS", "120")))
+PLACES_TILE_PAGE_SIZE = 20
+
+PLACES_TILE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, int(os.environ.get("PLACES_TILE_WORKERS", "4"))),
+    thread_name_prefix="places-tile"
+)
+PLACES_TILE_BULK_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, int(os.environ.get("PLACES_TILE_BULK_WORKERS", "2"))),
+    thread_name_prefix="places-tile-bulk"
+)
+
+HEX_DIRECTIONS = [(1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1)]
+
+
+def hex_tile_rings(radius_meters, tile_radius_meters):
+    spacing = tile_radius_meters * math.sqrt(3)
+    reach = radius_meters + tile_radius_meters / 2
+    rings = [[(0.0, 0.0)]]
+    ring_index = 1
+
+    while True:
+        ring = []
+        q, r = HEX_DIRECTIONS[4][0] * ring_index, HEX_DIRECTIONS[4][1] * ring_index
+
+        for dq, dr in HEX_DIRECTIONS:
+            for _ in range(ring_index):
+                east = spacing * (q + r / 2)
+                north = spacing * (r * math.sqrt(3) / 2)
+
+                if math.hypot(east, north) <= reach:
+                    ring.append((east, north))
+
+                q, r = q + dq, r + dr
+
+        if not ring:
+            return rings
+
+        rings.append(ring)
+        ring_index += 1
+
+
+def offset_lat_lng(lat, lng, east, north):
+    return (
+        lat + north / 111320.0,
+        lng + east / (111320.0 * max(0.01, math.cos(math.radians(lat))))
+    )
+
+
+def search_places_tile(headers, category, lat, lng, radius_meters):
+    low_lat, low_lng = offset_lat_lng(lat, lng, -radius_meters, -radius_meters)
+    high_lat, high_lng = offset_lat_lng(lat, lng, radius_meters, radius_meters)
+
+    with stage_timer("places_search_tile"):
+        response = http_request(
+            "POST",
+            "https://places.googleapis.com/v1/places:searchText",
+            headers=headers,
+            json={
+                "textQuery": category,
+                "locationRestriction": {
+                    "rectangle": {
+                        "low": {
+                            "latitude": low_lat,
+                            "longitude": low_lng
+                        },
+                        "high": {
+                            "latitude": high_lat,
+                            "longitude": high_lng
+                        }
+                    }
+                },
+                "maxResultCount": PLACES_TILE_PAGE_SIZE
+            }
+        )
+
+    response.raise_for_status()
+
+    return response.json().get("places", [])
+
+
+def search_places_tiled(market, category, radius_miles, limit, debug):
+    key = google_api_key()
+
+    if not key:
+        raise RuntimeError("GOOGLE_PLACES_API_KEY is not set")
+
+    lat, lng = geocode_market(market)
+    radius_meters = places_radius_meters(radius_miles)
+    tile_radius = max(1000.0, radius_meters / PLACES_TILE_SPLIT)
+    headers = new_places_headers(key)
+
+    debug["tile_radius_meters"] = int(tile_radius)
+    debug["tiles_searched"] = 0
+    debug["tile_waves"] = 0
+    debug["tile_errors"] = 0
+
+    places = []
+    seen = set()
+
+    executor = executor_for_priority(PLACES_TILE_EXECUTOR, PLACES_TILE_BULK_EXECUTOR)
+
+    for ring in hex_tile_rings(radius_meters, tile_radius):
+        futures = [
+            submit_in_context(
+                executor, search_places_tile, headers, category,
+                *offset_lat_lng(lat, lng, east, north), tile_radius
+            )
+            for east, north in ring
+        ]
+        new_count = 0
+        saturated = False
+
+        for future in futures:
+            try:
+                tile_places = future.result()
+            except Exception as e:
+                debug["tile_errors"] += 1
+                debug["last_error"] = "Tile search failed: " + str(e)
+                continue
+
+            saturated = saturated or len(tile_places) >= PLACES_TILE_PAGE_SIZE
+
+            for place in tile_places:
+                if place.get("id") and place["id"] not in seen:
+                    seen.add(place["id"])
+                    places.append(place)
+                    new_count += 1
+
+        debug["tiles_searched"] += len(ring)
+        debug["tile_waves"] += 1
+
+        if len(places) >= limit or not saturated or new_count < PLACES_TILE_MIN_NEW * len(ring):
+            break
+
+    debug["tiled_count"] = len(places)
+
+    if places:
+        debug["method_used"] = "Places API New Text Search, tiled"
+
+    return convert_new_places(places[:limit])
+
+
+def search_places(market, category, radius_miles, limit, debug, tiled=False):
+    if tiled:
+        try:
+            places = search_places_tiled(market, category, radius_miles, limit, debug)
+
+            if places:
+                return places
+
+        except Exception as e:
+            debug["last_error"] = "Tiled search failed: " + str(e)
+
+        limit = min(limit, PLACES_TILE_PAGE_SIZE)
+
+    key = google_api_key()
+
+    if not key:
+        raise RuntimeError("GOOGLE_PLACES_API_KEY is not set")
+
+    lat, lng = geocode_market(market)
+    radius_meters = places_radius_meters(radius_miles)
+    headers = new_places_headers(key)
+
+    try:
+        with stage_timer("places_search_new_location"):
+            response = http_request(
+                "POST",
+                "https://places.googleapis.com/v1/places:searchText",
+                headers=headers,
+                json={
+                    "textQuery": f"{category} in {market}",
+                    "locationBias": {
+                        "circle": {
+                            "center": {
+                                "latitude": lat,
+                                "longitude": lng
+                            },
+                            "radius": float(radius_meters)
+                        }
+                    },
+                    "maxResultCount": max(1, min(int(limit), 20))
+                }
+            )
+
+        response.raise_for_status()
+        data = response.json()
+        places = data.get("places", [])
+
+        debug["new_location_count"] = len(places)
+
+        if places:
+            debug["method_used"] = "Places API New Text Search with location bias"
+            return convert_new_places(places)
+
+    except Exception as e:
+        debug["last_error"] = "New location search failed: " + str(e)
+
+    try:
+        with stage_timer("places_search_new"):
+            response = http_request(
+                "POST",
+                "https://places.googleapis.com/v1/places:searchText",
+                headers=headers,
+                json={
+                    "textQuery": f"{category} in {market}",
+                    "maxResultCount": max(1, min(int(limit), 20))
+                }
+            )
+
+        response.raise_for_status()
+        data = response.json()
+        places = data.get("places", [])
+
+        debug["new_no_location_count"] = len(places)
+
+        if places:
+            debug["method_used"] = "Places API New Text Search without location bias"
+            return convert_new_places(places)
+
+    except Exception as e:
+        debug["last_error"] = "New no-location search failed: " + str(e)
+
+    try:
+        with stage_timer("places_search_legacy"):
+            data = google_get(
+                "https://maps.googleapis.com/maps/api/place/textsearch/json",
+                {"query": f"{category} in {market}"}
+            )
+
+        results = data.get("results", [])
+        debug["legacy_count"] = len(results)
+        debug["legacy_status"] = data.get("status", "")
+        debug["legacy_error_message"] = data.get("error_message", "")
+
+        if results:
+            debug["method_used"] = "Legacy Text Search fallback"
+            return results[:limit]
+
+    except Exception as e:
+        debug["last_error"] = "Legacy search failed: " + str(e)
+
+    debug["method_used"] = "No method returned places"
+
+    return []
+
+
+# Text search results barely change from day to day, so they are cached on
+# disk per normalized (market, category, radius, limit). Entries younger than
+# PLACES_CACHE_FRESH are served as-is; entries up to PLACES_CACHE_STALE older
+# than that are served immediately while a background refresh replaces them.
+PLACES_CACHE_FRESH = float(os.environ.get("PLACES_CACHE_FRESH", str(12 * 3600)))
+PLACES_CACHE_STALE = float(os.environ.get("PLACES_CACHE_STALE", str(4 * 24 * 3600)))
+PLACES_CACHE_MAX = int(os.environ.get("PLACES_CACHE_MAX", "2000"))
+
+PLACES_REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="places-refresh")
+PLACES_REFRESHING = set()
+PLACES_REFRESHING_LOCK = threading.Lock()
+
+
+def places_cache_key(market, category, radius_miles, limit, tiled=False, pages=1):
+    key = [
+        normalize_market(market),
+        " ".join((category or "").lower().split()),
+        round(float(radius_miles), 2),
+        int(limit)
+    ]
+
+    if tiled:
+        key.append("tiled")
+
+    if pages > 1:
+        key.append(f"pages:{pages}")
+
+    return json.dumps(key)
+
+
+def store_places_result(cache_key, places, debug):
+    if places:
+        disk_cache_set(
+            "places",
+            cache_key,
+            {"places": places, "debug": debug},
+            max_entries=PLACES_CACHE_MAX
+        )
+
+
+def refresh_places_result(cache_key, market, category, radius_miles, limit, tiled=False, pages=1):
+    priority = REQUEST_PRIORITY.set("bulk")
+
+    try:
+        debug = new_places_debug(market, category)
+
+        if pages > 1:
+            places = [
+                place
+                for page in search_places_pages(market, category, radius_miles, pages, limit, debug)
+                for place in page
+            ]
+        else:
+            places = search_places(market, category, radius_miles, limit, debug, tiled=tiled)
+
+        store_places_result(cache_key, places, debug)
+    except Exception as e:
+        print("Places background refresh failed:", e, flush=True)
+    finally:
+        REQUEST_PRIORITY.reset(priority)
+
+        with PLACES_REFRESHING_LOCK:
+            PLACES_REFRESHING.discard(cache_key)
 
-DIRECTORY_DOMAINS = [
-    "facebook.com", "instagram.com", "linktr.ee", "yelp.com", "square.site",
-    "sites.google.com", "business.site", "wixsite.com", "godaddysites.com",
-    "booking.com", "opentable.com", "toasttab.com", "clover.com",
-    "mindbodyonline.com", "vagaro.com", "schedulicity.com"
-]
 
-HIGH_VALUE_CATEGORIES = [
-    "med spa", "medical spa", "dentist", "chiropractor", "attorney",
-    "law firm", "roofing", "roofer", "hvac", "plumber", "electrician",
-    "contractor", "remodeler", "interior designer", "landscaper",
-    "pool service", "pest control", "veterinarian", "physical therapy",
-    "wellness", "salon", "fitness", "senior care", "mobility"
-]
+def refresh_places_in_background(cache_key, market, category, radius_miles, limit, tiled=False, pages=1):
+    with PLACES_REFRESHING_LOCK:
+        if cache_key in PLACES_REFRESHING:
+            return
 
+        PLACES_REFRESHING.add(cache_key)
 
-def google_api_key():
-    return os.environ.get("GOOGLE_PLACES_API_KEY", "").strip()
+    PLACES_REFRESH_EXECUTOR.submit(
+        refresh_places_result, cache_key, market, category, radius_miles, limit, tiled, pages
+    )
 
 
-def google_get(endpoint, params):
-    key = google_api_key()
+# Paged mode follows the New Text Search nextPageToken for up to `pages`
+# pages (PLACES_MAX_PAGES at most), stopping once `limit` places have
+# arrived, and yields each page as it arrives, so the caller can start
+# scanning while the next page loads. The full result is cached like a
+# single search, including stale-while-revalidate: a stale entry is served
+# and refreshed in the background. If the first page fails, the regular
+# single-query fallbacks run instead.
+PLACES_MAX_PAGES = max(1, int(os.environ.get("PLACES_MAX_PAGES", "3")))
+
+
+def search_places_page(headers, market, category, lat, lng, radius_meters, page_token=None,
+                       page_size=PLACES_TILE_PAGE_SIZE):
+    body = {
+        "textQuery": f"{category} in {market}",
+        "locationBias": {
+            "circle": {
+                "center": {
+                    "latitude": lat,
+                    "longitude": lng
+                },
+                "radius": float(radius_meters)
+            }
+        },
+        "pageSize": page_size
+    }
 
-    if not key:
-        raise RuntimeError("GOOGLE_PLACES_API_KEY is not set")
+    if page_token:
+        body["pageToken"] = page_token
+
+    with stage_timer("places_search_page"):
+        response = http_request(
+            "POST",
+            "https://places.googleapis.com/v1/places:searchText",
+            headers=headers,
+            json=body
+        )
 
-    params["key"] = key
-    response = requests.get(endpoint, params=params, timeout=TIMEOUT)
     response.raise_for_status()
+    data = response.json()
 
-    return response.json()
+    return data.get("places", []), data.get("nextPageToken")
 
 
-def geocode_market(market):
-    data = google_get(
-        "https://maps.googleapis.com/maps/api/geocode/json",
-        {"address": market}
+def iter_places_pages(market, category, radius_miles, pages, limit, debug):
+    cache_key = places_cache_key(market, category, radius_miles, limit, pages=pages)
+    cached, age = disk_cache_get(
+        "places",
+        cache_key,
+        max_age=PLACES_CACHE_FRESH + PLACES_CACHE_STALE
     )
 
-    if data.get("status") != "OK" or not data.get("results"):
-        raise RuntimeError(f"Could not geocode market. Status: {data.get('status')}")
+    if cached is not None:
+        debug.update(cached["debug"])
+        debug["cache"] = "hit" if age <= PLACES_CACHE_FRESH else "stale"
+        debug["cache_age_seconds"] = int(age)
 
-    loc = data["results"][0]["geometry"]["location"]
+        if debug["cache"] == "stale":
+            refresh_places_in_background(cache_key, market, category, radius_miles, limit, pages=pages)
 
-    return loc["lat"], loc["lng"]
+        yield cached["places"]
+        return
 
+    debug["cache"] = "miss"
+    debug["cache_age_seconds"] = 0
+    places = []
 
-def places_nearby_search(market, category, radius_miles=15, limit=20):
-    global LAST_PLACES_DEBUG
+    for page in search_places_pages(market, category, radius_miles, pages, limit, debug):
+        places.extend(page)
+        yield page
+
+    store_places_result(cache_key, places, debug)
+
+
+def search_places_pages(market, category, radius_miles, pages, limit, debug):
+    debug["pages_fetched"] = 0
 
     key = google_api_key()
 
     if not key:
         raise RuntimeError("GOOGLE_PLACES_API_KEY is not set")
 
-    LAST_PLACES_DEBUG = {
-        "query": f"{category} in {market}",
-        "method_used": "",
-        "new_location_count": 0,
-        "new_no_location_count": 0,
-        "legacy_count": 0,
-        "legacy_status": "",
-        "legacy_error_message": "",
-        "last_error": ""
-    }
-
     lat, lng = geocode_market(market)
-    radius_meters = max(1000, min(int(float(radius_miles) * 1609.34), 50000))
-
-    def convert_new_places(places):
-        results = []
-
-        for p in places:
-            results.append({
-                "place_id": p.get("id"),
-                "_new_place_details": {
-                    "name": (p.get("displayName") or {}).get("text", ""),
-                    "formatted_address": p.get("formattedAddress", ""),
-                    "formatted_phone_number": p.get("nationalPhoneNumber", ""),
-                    "international_phone_number": p.get("internationalPhoneNumber", ""),
-                    "website": p.get("websiteUri", ""),
-                    "rating": p.get("rating", 0),
-                    "user_ratings_total": p.get("userRatingCount", 0),
-                    "types": p.get("types", []),
-                    "url": p.get("googleMapsUri", ""),
-                    "business_status": p.get("businessStatus", "")
-                }
-            })
+    headers = new_places_headers(key)
+    radius_meters = places_radius_meters(radius_miles)
+    places = []
+    page_token = None
 
-        return results
+    for _ in range(pages):
+        page_size = min(PLACES_TILE_PAGE_SIZE, limit - len(places))
 
-    headers = {
-        "Content-Type": "application/json",
-        "X-Goog-Api-Key": key,
-        "X-Goog-FieldMask": (
-            "places.id,"
-            "places.displayName,"
-            "places.formattedAddress,"
-            "places.nationalPhoneNumber,"
-            "places.internationalPhoneNumber,"
-            "places.websiteUri,"
-            "places.rating,"
-            "places.userRatingCount,"
-            "places.googleMapsUri,"
-            "places.businessStatus,"
-            "places.types"
-        )
-    }
+        try:
+            page, page_token = search_places_page(
+                headers, market, category, lat, lng, radius_meters, page_token, page_size
+            )
+        except Exception as e:
+            debug["last_error"] = f"Page {debug['pages_fetched'] + 1} search failed: " + str(e)
+            break
 
-    try:
-        response = requests.post(
-            "https://places.googleapis.com/v1/places:searchText",
-            headers=headers,
-            json={
-                "textQuery": f"{category} in {market}",
-                "locationBias": {
-                    "circle": {
-                        "center": {
-                            "latitude": lat,
-                            "longitude": lng
-                        },
-                        "radius": float(radius_meters)
-                    }
-                },
-                "maxResultCount": max(1, min(int(limit), 20))
-            },
-            timeout=TIMEOUT
-        )
+        debug["pages_fetched"] += 1
+        page = convert_new_places(page)[:page_size]
+        places.extend(page)
 
-        response.raise_for_status()
-        data = response.json()
-        places = data.get("places", [])
+        if page:
+            yield page
+
+        if not page_token or len(places) >= limit:
+            break
 
-        LAST_PLACES_DEBUG["new_location_count"] = len(places)
+    if places:
+        debug["method_used"] = "Places API New Text Search, paged"
+        debug["new_location_count"] = len(places)
+    else:
+        places = search_places(market, category, radius_miles, min(limit, PLACES_TILE_PAGE_SIZE), debug)
 
         if places:
-            LAST_PLACES_DEBUG["method_used"] = "Places API New Text Search with location bias"
-            return convert_new_places(places)
+            yield places
 
-    except Exception as e:
-        LAST_PLACES_DEBUG["last_error"] = "New location search failed: " + str(e)
 
-    try:
-        response = requests.post(
-            "https://places.googleapis.com/v1/places:searchText",
-            headers=headers,
-            json={
-                "textQuery": f"{category} in {market}",
-                "maxResultCount": max(1, min(int(limit), 20))
-            },
-            timeout=TIMEOUT
-        )
+# Search diagnostics are written into the caller's `debug` dict rather than
+# shared state, so concurrent requests each report their own places_debug.
+def places_nearby_search(market, category, radius_miles=15, limit=20, tiled=False, debug=None):
+    if debug is None:
+        debug = {}
 
-        response.raise_for_status()
-        data = response.json()
-        places = data.get("places", [])
+    cache_key = places_cache_key(market, category, radius_miles, limit, tiled)
+    cached, age = disk_cache_get(
+        "places",
+        cache_key,
+        max_age=PLACES_CACHE_FRESH + PLACES_CACHE_STALE
+    )
 
-        LAST_PLACES_DEBUG["new_no_location_count"] = len(places)
+    if cached is not None:
+        debug.update(cached["debug"])
+        debug["cache"] = "hit" if age <= PLACES_CACHE_FRESH else "stale"
+        debug["cache_age_seconds"] = int(age)
 
-        if places:
-            LAST_PLACES_DEBUG["method_used"] = "Places API New Text Search without location bias"
-            return convert_new_places(places)
+        if debug["cache"] == "stale":
+            refresh_places_in_background(cache_key, market, category, radius_miles, limit, tiled)
 
-    except Exception as e:
-        LAST_PLACES_DEBUG["last_error"] = "New no-location search failed: " + str(e)
+        return cached["places"]
 
-    try:
-        data = google_get(
-            "https://maps.googleapis.com/maps/api/place/textsearch/json",
-            {"query": f"{category} in {market}"}
-        )
+    debug.update(new_places_debug(market, category))
+    debug["cache"] = "miss"
+    debug["cache_age_seconds"] = 0
 
-        results = data.get("results", [])
-        LAST_PLACES_DEBUG["legacy_count"] = len(results)
-        LAST_PLACES_DEBUG["legacy_status"] = data.get("status", "")
-        LAST_PLACES_DEBUG["legacy_error_message"] = data.get("error_message", "")
+    places = search_places(market, category, radius_miles, limit, debug, tiled=tiled)
+    store_places_result(cache_key, places, debug)
 
-        if results:
-            LAST_PLACES_DEBUG["method_used"] = "Legacy Text Search fallback"
-            return results[:limit]
+    return places
 
-    except Exception as e:
-        LAST_PLACES_DEBUG["last_error"] = "Legacy search failed: " + str(e)
 
-    LAST_PLACES_DEBUG["method_used"] = "No method returned places"
+# Legacy Text Search results carry only a place_id, so details are looked up
+# per place. Lookups run concurrently on a small pool and are kept in the disk
+# cache by place_id, so repeat searches over a market skip businesses we have
+# already seen.
+PLACE_DETAILS_CACHE_TTL = float(os.environ.get("PLACE_DETAILS_CACHE_TTL", str(7 * 24 * 3600)))
+PLACE_DETAILS_CACHE_MAX = int(os.environ.get("PLACE_DETAILS_CACHE_MAX", "20000"))
+PLACE_DETAILS_WORKERS = max(1, int(os.environ.get("PLACE_DETAILS_WORKERS", "8")))
 
-    return []
+PLACE_DETAILS_EXECUTOR = ThreadPoolExecutor(
+    max_workers=PLACE_DETAILS_WORKERS,
+    thread_name_prefix="place-details"
+)
+PLACE_DETAILS_BULK_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, int(os.environ.get("PLACE_DETAILS_BULK_WORKERS", "4"))),
+    thread_name_prefix="place-details-bulk"
+)
 
 
 def place_details(place_id):
@@ -441,13 +2245,14 @@ def place_details(place_id):
         "business_status"
     ])
 
-    data = google_get(
-        "https://maps.googleapis.com/maps/api/place/details/json",
-        {
-            "place_id": place_id,
-            "fields": fields
-        }
-    )
+    with stage_timer("place_details"):
+        data = google_get(
+            "https://maps.googleapis.com/maps/api/place/details/json",
+            {
+                "place_id": place_id,
+                "fields": fields
+            }
+        )
 
     if data.get("status") != "OK":
         return {}
@@ -455,6 +2260,35 @@ def place_details(place_id):
     return data.get("result", {})
 
 
+def cached_place_details(place_id):
+    cached, age = disk_cache_get("place_details", place_id, max_age=PLACE_DETAILS_CACHE_TTL)
+
+    if cached:
+        return cached
+
+    try:
+        details = place_details(place_id)
+    except Exception as e:
+        print(f"Place details failed for {place_id}:", e, flush=True)
+        return {}
+
+    if details:
+        disk_cache_set("place_details", place_id, details, max_entries=PLACE_DETAILS_CACHE_MAX)
+
+    return details
+
+
+def place_details_many(place_ids):
+    place_ids = list(dict.fromkeys(p for p in place_ids if p))
+    executor = executor_for_priority(PLACE_DETAILS_EXECUTOR, PLACE_DETAILS_BULK_EXECUTOR)
+    futures = {
+        place_id: submit_in_context(executor, cached_place_details, place_id)
+        for place_id in place_ids
+    }
+
+    return {place_id: future.result() for place_id, future in futures.items()}
+
+
 def hostname_from_url(url):
     try:
         parsed = urlparse(url if url.startswith(("http://", "https://")) else "https://" + url)
@@ -469,14 +2303,14 @@ def is_directory_or_social_site(url):
     if not host:
         return False
 
-    return any(domain in host for domain in DIRECTORY_DOMAINS)
+    return host_in_domain_index(host, DIRECTORY_DOMAIN_INDEX)
 
 
 def likely_chain_business(name, website, address=""):
     blob = f"{name or ''} {website or ''} {address or ''}".lower()
     host = hostname_from_url(website or "")
 
-    if any(hint in blob for hint in CHAIN_HINTS):
+    if CHAIN_MATCHER.search(blob):
         return True
 
     chain_url_patterns = [
@@ -490,7 +2324,7 @@ def likely_chain_business(name, website, address=""):
     if any(pattern in (website or "").lower() for pattern in chain_url_patterns):
         return True
 
-    if host and any(hint.replace(" ", "") in host for hint in CHAIN_HINTS):
+    if host and CHAIN_HOST_MATCHER.search(host):
         return True
 
     return False
@@ -511,31 +2345,66 @@ def extract_city_from_address(address):
     return ""
 
 
-def find_contact_name_from_site(soup):
-    if not soup:
+# Text signals are matched with patterns compiled once at import, and only
+# against the part of the page they are about: visible text for contacts and
+# calls-to-action, footer text for copyright years. Each region is capped at
+# SIGNAL_SCAN_MAX_CHARS (head and tail kept) and all patterns for a page share
+# a SIGNAL_SCAN_MAX_SECONDS budget, so pathological pages cannot pin a worker.
+SIGNAL_SCAN_MAX_CHARS = int(os.environ.get("SIGNAL_SCAN_MAX_CHARS", "200000"))
+SIGNAL_SCAN_MAX_SECONDS = float(os.environ.get("SIGNAL_SCAN_MAX_SECONDS", "0.5"))
+FOOTER_FALLBACK_CHARS = 2000
+
+CONTACT_ROLES = "Founder|Owner|President|Principal|CEO|Director|Practice Manager|Office Manager|General Manager"
+
+CONTACT_NAME_PATTERNS = [
+    re.compile(rf"(?:{CONTACT_ROLES})\s*[:\-–]\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+){{1,2}})"),
+    re.compile(rf"([A-Z][a-z]+(?:\s+[A-Z][a-z]+){{1,2}})\s*,?\s*(?:{CONTACT_ROLES})"),
+    re.compile(r"(?:Dr\.|Doctor)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,2})")
+]
+CONTACT_ROLE_PATTERN = re.compile(rf"({CONTACT_ROLES}|Dr\.)")
+CALL_TO_ACTION_PATTERN = re.compile(r"\b(contact|quote|appointment|schedule|book|call now|request)\b", re.I)
+COPYRIGHT_YEAR_PATTERN = re.compile(r"(?:©|copyright)?\s*(20[0-2][0-9]|19[8-9][0-9])", re.I)
+
+
+def bounded_text(text, limit=None):
+    limit = SIGNAL_SCAN_MAX_CHARS if limit is None else limit
+
+    if len(text) <= limit:
+        return text
+
+    half = limit // 2
+
+    return text[:half] + " " + text[-half:]
+
+
+def page_text_regions(page):
+    footer = page.get("footer_text") or page["text"][-FOOTER_FALLBACK_CHARS:]
+
+    return {
+        "text": bounded_text(page["text"]),
+        "footer": bounded_text(footer)
+    }
+
+
+def find_contact_name_from_site(page, deadline=None):
+    if not page:
         return {
             "name": "",
             "role": "",
             "confidence": "Unknown"
         }
 
-    text = soup.get_text(" ", strip=True)
+    text = page_text_regions(page)["text"]
 
-    patterns = [
-        r"(?:Founder|Owner|President|Principal|CEO|Director|Practice Manager|Office Manager|General Manager)\s*[:\-–]\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,2})",
-        r"([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,2})\s*,?\s*(?:Founder|Owner|President|Principal|CEO|Director|Practice Manager|Office Manager|General Manager)",
-        r"(?:Dr\.|Doctor)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,2})"
-    ]
+    for pattern in CONTACT_NAME_PATTERNS:
+        if deadline is not None and time.monotonic() > deadline:
+            break
 
-    for pattern in patterns:
-        match = re.search(pattern, text)
+        match = pattern.search(text)
 
         if match:
             name = match.group(1).strip()
-            role_match = re.search(
-                r"(Founder|Owner|President|Principal|CEO|Director|Practice Manager|Office Manager|General Manager|Dr\.)",
-                match.group(0)
-            )
+            role_match = CONTACT_ROLE_PATTERN.search(match.group(0))
             role = role_match.group(1) if role_match else "Possible contact"
 
             return {
@@ -550,6 +2419,72 @@ def find_contact_name_from_site(soup):
         "confidence": "Unknown"
     }
 
+
+def scan_text_signals(page):
+    with stage_timer("text_signals"):
+        return match_text_signals(page)
+
+
+def match_text_signals(page):
+    deadline = time.monotonic() + SIGNAL_SCAN_MAX_SECONDS
+    regions = page_text_regions(page)
+
+    signals = {
+        "contact_mentions": len(CALL_TO_ACTION_PATTERN.findall(regions["text"])),
+        "copyright_years": [],
+        "contact": find_contact_name_from_site(None),
+        "budget_exceeded": False
+    }
+
+    if time.monotonic() <= deadline:
+        signals["copyright_years"] = [int(y) for y in COPYRIGHT_YEAR_PATTERN.findall(regions["footer"])]
+
+    if time.monotonic() <= deadline:
+        signals["contact"] = find_contact_name_from_site(page, deadline=deadline)
+
+    if time.monotonic() > deadline:
+        signals["budget_exceeded"] = True
+        print("Text signal scan exceeded its time budget", flush=True)
+
+    return signals
+
+
+# Successful scans are stored on disk with the page's ETag / Last-Modified.
+# The next scan of that URL sends them as If-None-Match / If-Modified-Since,
+# and a 304 returns the stored scan with no download, parse or site probes.
+SITE_SCAN_CACHE_TTL = float(os.environ.get("SITE_SCAN_CACHE_TTL", str(30 * 24 * 3600)))
+SITE_SCAN_CACHE_MAX = int(os.environ.get("SITE_SCAN_CACHE_MAX", "20000"))
+
+
+def site_scan_cache_key(url):
+    return json.dumps([url, bool(LEAD_SCAN_METADATA_ONLY)])
+
+
+def conditional_headers(stored):
+    headers = {}
+
+    if stored and stored.get("etag"):
+        headers["If-None-Match"] = stored["etag"]
+
+    if stored and stored.get("last_modified"):
+        headers["If-Modified-Since"] = stored["last_modified"]
+
+    return headers
+
+
+def store_site_scan(url, response_headers, result):
+    etag = response_headers.get("ETag") or ""
+    last_modified = response_headers.get("Last-Modified") or ""
+
+    if etag or last_modified:
+        disk_cache_set(
+            "site_scans",
+            site_scan_cache_key(url),
+            {"etag": etag, "last_modified": last_modified, "scan": result},
+            max_entries=SITE_SCAN_CACHE_MAX
+        )
+
+
 def scan_business_website(url):
     result = {
         "website_status": "No website found",
@@ -561,6 +2496,7 @@ def scan_business_website(url):
         "contact_name": "",
         "contact_role": "",
         "contact_confidence": "Unknown",
+        "page_truncated": False,
         "seo_score": 0,
         "website_opportunity_score": 75
     }
@@ -584,63 +2520,74 @@ def scan_business_website(url):
         result["website_opportunity_score"] = 88
         return result
 
+    stored, age = disk_cache_get("site_scans", site_scan_cache_key(normalized), max_age=SITE_SCAN_CACHE_TTL)
+    validators = conditional_headers(stored)
+    probes = None if validators else start_site_probes(normalized)
+
     try:
-        r = fetch(normalized)
+        fetched = fetch(normalized, metadata_only=LEAD_SCAN_METADATA_ONLY, headers=validators)
     except Exception as e:
         result["website_status"] = "Website did not load"
         result["detected_issues"].append(f"Website fetch failed: {str(e)[:90]}")
         result["website_opportunity_score"] = 86
         return result
 
-    if r.status_code >= 400:
-        result["website_status"] = f"Website returned status {r.status_code}"
-        result["detected_issues"].append(f"Website returned HTTP status {r.status_code}")
+    if fetched["status_code"] == 304 and stored:
+        return stored["scan"]
+
+    if fetched["status_code"] >= 400:
+        result["website_status"] = f"Website returned status {fetched['status_code']}"
+        result["detected_issues"].append(f"Website returned HTTP status {fetched['status_code']}")
+        result["website_opportunity_score"] = 84
+        return result
+
+    if not is_html_page(fetched):
+        result["website_status"] = "Website did not return an HTML page"
+        result["detected_issues"].append(f"Website returned {fetched['content_type']} instead of an HTML page")
         result["website_opportunity_score"] = 84
         return result
 
     result["website_status"] = "Website found"
     result["website_loads"] = True
 
-    html = r.text or ""
-    soup = BeautifulSoup(html, "html.parser")
-
-    parsed = urlparse(normalized)
-    https_ok = parsed.scheme.lower() == "https"
-
-    title = (soup.title.string or "").strip() if soup.title and soup.title.string else ""
-
-    md = soup.find("meta", attrs={"name": "description"})
-    description = (md.get("content") or "").strip() if md else ""
-
-    h1_tags = [h.get_text(strip=True) for h in soup.find_all("h1")]
-    viewport = soup.find("meta", attrs={"name": "viewport"})
-    canonical = soup.find("link", attrs={"rel": "canonical"})
-    schema_scripts = soup.find_all("script", attrs={"type": "application/ld+json"})
-
-    imgs = soup.find_all("img")
-    imgs_without_alt = sum(1 for im in imgs if not (im.get("alt") or "").strip())
+    if probes is None:
+        probes = start_site_probes(normalized)
 
-    for t in soup(["script", "style", "noscript"]):
-        t.extract()
+    page = fetched["signals"]
+    text_signals = scan_text_signals(page)
+    # Only part of the page was read, so anything that may sit later in the
+    # page is reported when found but not flagged when missing.
+    truncated = fetched["truncated"]
+    result["page_truncated"] = truncated
 
-    text = soup.get_text(separator=" ")
-    words = [w for w in text.split() if w.isalpha() or any(c.isalnum() for c in w)]
-    word_count = len(words)
+    if truncated:
+        result["freshness_signals"].append(
+            f"Only the first {(fetched['bytes_read'] + 1023) // 1024} KB of the page were scanned"
+        )
 
-    tel_links = soup.find_all("a", href=lambda h: h and h.lower().startswith("tel:"))
-    mail_links = soup.find_all("a", href=lambda h: h and h.lower().startswith("mailto:"))
-    contact_mentions = len(re.findall(r"\b(contact|quote|appointment|schedule|book|call now|request)\b", text, re.I))
+    parsed = urlparse(normalized)
+    https_ok = parsed.scheme.lower() == "https"
 
-    copyright_years = [
-        int(y) for y in re.findall(r"(?:©|copyright)?\s*(20[0-2][0-9]|19[8-9][0-9])", html, re.I)
-    ]
+    title = page["title"]
+    description = page["description"]
+    h1_tags = page["h1_tags"]
+    viewport = page["viewport"]
+    canonical = page["canonical"]
+    schema_scripts = page["schema_scripts"]
+    img_count = page["img_count"]
+    imgs_without_alt = page["imgs_without_alt"]
+    word_count = page["word_count"]
+    tel_links = page["tel_links"]
+    mail_links = page["mail_links"]
+    contact_mentions = text_signals["contact_mentions"]
+    copyright_years = text_signals["copyright_years"]
 
     newest_copyright = max(copyright_years) if copyright_years else None
 
     if newest_copyright:
         result["freshness_signals"].append(f"Footer/copyright year detected: {newest_copyright}")
 
-        if newest_copyright <= 2021:
+        if newest_copyright <= 2021 and not truncated:
             result["detected_issues"].append(f"Older copyright signal detected: {newest_copyright}")
 
     if not https_ok:
@@ -653,7 +2600,8 @@ def scan_business_website(url):
         result["detected_issues"].append("Missing meta description")
 
     if len(h1_tags) == 0:
-        result["detected_issues"].append("No H1 heading found")
+        if not truncated:
+            result["detected_issues"].append("No H1 heading found")
     elif len(h1_tags) > 1:
         result["detected_issues"].append(f"Multiple H1 headings found: {len(h1_tags)}")
 
@@ -663,49 +2611,27 @@ def scan_business_website(url):
     if not canonical:
         result["detected_issues"].append("No canonical tag detected")
 
-    if not schema_scripts:
+    if not schema_scripts and not truncated:
         result["detected_issues"].append("No schema markup detected")
 
-    if word_count < 300:
+    if word_count < 300 and not truncated:
         result["detected_issues"].append(f"Thin page content detected: {word_count} words")
 
     if imgs_without_alt > 0:
-        result["detected_issues"].append(f"{imgs_without_alt} image(s) missing ALT text")
+        at_least = "At least " if truncated else ""
+        result["detected_issues"].append(f"{at_least}{imgs_without_alt} image(s) missing ALT text")
 
-    if not tel_links:
+    if not tel_links and not truncated:
         result["detected_issues"].append("No clickable phone link found")
 
-    if not mail_links:
+    if not mail_links and not truncated:
         result["freshness_signals"].append("No mailto email link found")
 
-    if contact_mentions < 2:
+    if contact_mentions < 2 and not truncated:
         result["detected_issues"].append("Weak or unclear call-to-action signals")
 
-    base = f"{parsed.scheme}://{parsed.netloc}"
-    robots_ok = False
-    sitemap_ok = False
-
-    try:
-        rr = requests.head(
-            urljoin(base, "/robots.txt"),
-            headers={"User-Agent": UA},
-            timeout=TIMEOUT,
-            allow_redirects=True
-        )
-        robots_ok = rr.status_code == 200
-    except Exception:
-        pass
-
-    try:
-        sr = requests.head(
-            urljoin(base, "/sitemap.xml"),
-            headers={"User-Agent": UA},
-            timeout=TIMEOUT,
-            allow_redirects=True
-        )
-        sitemap_ok = sr.status_code == 200
-    except Exception:
-        pass
+    robots_ok = probes["robots"].result()
+    sitemap_ok = probes["sitemap"].result()
 
     if not robots_ok:
         result["detected_issues"].append("robots.txt not found")
@@ -713,7 +2639,7 @@ def scan_business_website(url):
     if not sitemap_ok:
         result["detected_issues"].append("XML sitemap not found")
 
-    contact = find_contact_name_from_site(soup)
+    contact = text_signals["contact"]
     result["contact_name"] = contact["name"]
     result["contact_role"] = contact["role"]
     result["contact_confidence"] = contact["confidence"]
@@ -748,8 +2674,8 @@ def scan_business_website(url):
     elif word_count >= 250:
         seo_score += 4
 
-    if len(imgs) > 0:
-        alt_ratio = (len(imgs) - imgs_without_alt) / len(imgs)
+    if img_count > 0:
+        alt_ratio = (img_count - imgs_without_alt) / img_count
 
         if alt_ratio >= 0.9:
             seo_score += 8
@@ -768,9 +2694,62 @@ def scan_business_website(url):
     issue_boost = min(len(result["detected_issues"]) * 4, 28)
     result["website_opportunity_score"] = max(15, min(100, int((100 - seo_score) + issue_boost)))
 
+    store_site_scan(normalized, fetched["headers"], result)
+
     return result
 
 
+# Website scans run on a shared pool so one lead request no longer waits on
+# each site in turn. LEAD_SCAN_WORKERS caps concurrent scans across all
+# requests in the worker; LEAD_SCAN_PER_HOST keeps us polite to any single host.
+LEAD_SCAN_WORKERS = max(1, int(os.environ.get("LEAD_SCAN_WORKERS", "8")))
+LEAD_SCAN_PER_HOST = max(1, int(os.environ.get("LEAD_SCAN_PER_HOST", "2")))
+
+LEAD_SCAN_EXECUTOR = ThreadPoolExecutor(
+    max_workers=LEAD_SCAN_WORKERS,
+    thread_name_prefix="lead-scan"
+)
+LEAD_SCAN_BULK_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, int(os.environ.get("LEAD_SCAN_BULK_WORKERS", "4"))),
+    thread_name_prefix="lead-scan-bulk"
+)
+
+HOST_SCAN_SLOTS = {}
+HOST_SCAN_SLOTS_LOCK = threading.Lock()
+
+
+@contextmanager
+def host_scan_slot(url):
+    host = hostname_from_url(url or "")
+
+    if not host:
+        yield
+        return
+
+    with HOST_SCAN_SLOTS_LOCK:
+        slot = HOST_SCAN_SLOTS.get(host)
+
+        if slot is None:
+            slot = HOST_SCAN_SLOTS[host] = [threading.BoundedSemaphore(LEAD_SCAN_PER_HOST), 0]
+
+        slot[1] += 1
+
+    try:
+        with slot[0]:
+            yield
+    finally:
+        with HOST_SCAN_SLOTS_LOCK:
+            slot[1] -= 1
+
+            if slot[1] == 0 and HOST_SCAN_SLOTS.get(host) is slot:
+                del HOST_SCAN_SLOTS[host]
+
+
+def scan_business_website_politely(url):
+    with host_scan_slot(url):
+        return scan_business_website(url)
+
+
 def business_quality_score(place, category, is_chain):
     rating = float(place.get("rating") or 0)
     reviews = int(place.get("user_ratings_total") or 0)
@@ -882,31 +2861,177 @@ def build_outreach_opener(place, category, market, website_scan, recommended_off
     )
 
 
-@app.route("/existing-business-leads", methods=["POST"])
-def existing_business_leads():
-    data = request.get_json(force=True)
+def build_lead(details, is_chain, website_scan, category, market):
+    with stage_timer("lead_scoring"):
+        return score_lead(details, is_chain, website_scan, category, market)
 
-    market = (data.get("market") or "St. Petersburg, FL").strip()
-    category = (data.get("category") or "med spa").strip()
-    radius_miles = float(data.get("radius_miles") or 15)
-    min_reviews = int(data.get("min_reviews") or 20)
-    min_rating = float(data.get("min_rating") or 4.0)
-    exclude_chains = bool(data.get("exclude_chains", True))
-    limit = int(data.get("limit") or 20)
-    limit = max(1, min(limit, 20))
 
-    if not category:
-        return jsonify({"error": "Missing category"}), 400
+def score_lead(details, is_chain, website_scan, category, market):
+    rating = float(details.get("rating") or 0)
+    reviews = int(details.get("user_ratings_total") or 0)
+    website = details.get("website") or ""
+    address = details.get("formatted_address") or ""
+    name = details.get("name") or ""
+
+    quality = business_quality_score(details, category, is_chain)
+    opportunity = int(website_scan.get("website_opportunity_score") or 0)
+
+    priority = int(round((quality * 0.52) + (opportunity * 0.48)))
+    label = lead_priority_label(priority, website_scan, is_chain)
+    offer = recommended_offer_for_lead(website_scan)
+    opener = build_outreach_opener(details, category, market, website_scan, offer)
+
+    return {
+        "business_name": name,
+        "category": category,
+        "market": market,
+        "city": extract_city_from_address(address),
+        "address": address,
+        "phone": details.get("formatted_phone_number") or details.get("international_phone_number") or "",
+        "google_rating": rating,
+        "review_count": reviews,
+        "google_listing_url": details.get("url") or "",
+        "website": website,
+        "website_status": website_scan.get("website_status"),
+        "website_loads": website_scan.get("website_loads"),
+        "is_directory_site": website_scan.get("is_directory_site"),
+        "small_business_confidence": "Low" if is_chain else "Medium",
+        "possible_chain": is_chain,
+        "contact_name": website_scan.get("contact_name"),
+        "contact_role": website_scan.get("contact_role"),
+        "contact_confidence": website_scan.get("contact_confidence"),
+        "seo_score": website_scan.get("seo_score"),
+        "business_quality_score": quality,
+        "website_opportunity_score": opportunity,
+        "lead_priority_score": priority,
+        "priority_label": label,
+        "detected_issues": website_scan.get("detected_issues", [])[:8],
+        "freshness_signals": website_scan.get("freshness_signals", [])[:5],
+        "recommended_offer": offer,
+        "outreach_opener": opener
+    }
+
+
+# Lead results can be streamed instead of returned in one JSON body. Send
+# "stream": "ndjson" or "sse" (or the matching Accept header) and each lead is
+# emitted as soon as its website scan finishes, followed by a summary event
+# with the debug counters and the lead indexes in priority order.
+LEAD_STREAM_MIMETYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream"
+}
+
+
+def lead_stream_format(data):
+    value = str(data.get("stream") or "").strip().lower()
+
+    if value in LEAD_STREAM_MIMETYPES:
+        return value
+
+    accept = request.headers.get("Accept") or ""
+
+    for stream_format, mimetype in LEAD_STREAM_MIMETYPES.items():
+        if mimetype in accept:
+            return stream_format
+
+    return ""
+
+
+def lead_stream_event(stream_format, event, payload):
+    body = app.json.dumps(dict(payload, type=event))
+
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {body}\n\n"
+
+    return body + "\n"
+
+
+# Website scans start as soon as each page of candidates is ready. Batches
+# are pulled from candidate_batches on PLACES_PAGE_EXECUTOR, so the next page
+# of Places results loads while the current page's sites are being scanned.
+# Results are yielded as (index, details, is_chain, website_scan) in completion
+# order, with index counting candidates in arrival order.
+PLACES_PAGE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, int(os.environ.get("PLACES_PAGE_WORKERS", "8"))),
+    thread_name_prefix="places-page"
+)
+
+
+def pipeline_lead_scans(candidate_batches):
+    batches = iter(candidate_batches)
+    page_future = submit_in_context(PLACES_PAGE_EXECUTOR, next, batches, None)
+    scans = {}
+    count = 0
+
+    try:
+        while page_future or scans:
+            waiting = set(scans)
+
+            if page_future:
+                waiting.add(page_future)
+
+            done, _ = wait(waiting, return_when=FIRST_COMPLETED)
+
+            if page_future in done:
+                batch = page_future.result()
+                page_future = None
+
+                if batch is not None:
+                    for details, is_chain in batch:
+                        future = submit_in_context(
+                            executor_for_priority(LEAD_SCAN_EXECUTOR, LEAD_SCAN_BULK_EXECUTOR),
+                            scan_business_website_politely, details.get("website") or ""
+                        )
+                        scans[future] = (count, details, is_chain)
+                        count += 1
+
+                    page_future = submit_in_context(PLACES_PAGE_EXECUTOR, next, batches, None)
+
+            for future in done:
+                if future in scans:
+                    index, details, is_chain = scans.pop(future)
+                    yield index, details, is_chain, future.result()
+
+    finally:
+        for future in scans:
+            future.cancel()
+
+
+def stream_leads(stream_format, candidate_batches, category, market, radius_miles, debug, places_debug, include_timings=False):
+    results = pipeline_lead_scans(candidate_batches)
+    ranking = []
+
+    try:
+        for index, details, is_chain, website_scan in results:
+            lead = build_lead(details, is_chain, website_scan, category, market)
+            ranking.append((-lead["lead_priority_score"], index))
+
+            yield lead_stream_event(stream_format, "lead", {"index": index, "lead": lead})
+
+    finally:
+        results.close()
+
+    ranking.sort()
 
-    try:
-        raw_places = places_nearby_search(market, category, radius_miles, limit=limit)
-    except Exception as e:
-        return jsonify({"error": f"Google Places search failed: {e}"}), 400
+    summary = {
+        "market": market,
+        "category": category,
+        "radius_miles": radius_miles,
+        "count": len(ranking),
+        "debug": debug,
+        "places_debug": places_debug,
+        "order": [index for priority, index in ranking]
+    }
 
-    leads = []
+    if include_timings:
+        summary["timings"] = request_timings_summary()
+
+    yield lead_stream_event(stream_format, "summary", summary)
 
-    debug = {
-        "raw_places_returned": len(raw_places),
+
+def new_lead_debug():
+    return {
+        "raw_places_returned": 0,
         "skipped_no_place_id": 0,
         "skipped_no_details": 0,
         "skipped_low_rating": 0,
@@ -915,6 +3040,17 @@ def existing_business_leads():
         "processed": 0
     }
 
+
+def select_lead_candidates(raw_places, min_rating, min_reviews, exclude_chains, debug=None):
+    if debug is None:
+        debug = new_lead_debug()
+
+    debug["raw_places_returned"] += len(raw_places)
+    candidates = []
+    details_by_id = place_details_many(
+        item.get("place_id") for item in raw_places if not item.get("_new_place_details")
+    )
+
     for item in raw_places:
         place_id = item.get("place_id")
 
@@ -922,7 +3058,7 @@ def existing_business_leads():
             debug["skipped_no_place_id"] += 1
             continue
 
-        details = item.get("_new_place_details") or place_details(place_id)
+        details = item.get("_new_place_details") or details_by_id.get(place_id)
 
         if not details:
             debug["skipped_no_details"] += 1
@@ -951,59 +3087,347 @@ def existing_business_leads():
             debug["skipped_chain"] += 1
             continue
 
-        website_scan = scan_business_website(website)
-        quality = business_quality_score(details, category, is_chain)
-        opportunity = int(website_scan.get("website_opportunity_score") or 0)
-
-        priority = int(round((quality * 0.52) + (opportunity * 0.48)))
-        label = lead_priority_label(priority, website_scan, is_chain)
-        offer = recommended_offer_for_lead(website_scan)
-        opener = build_outreach_opener(details, category, market, website_scan, offer)
-
-        lead = {
-            "business_name": name,
-            "category": category,
-            "market": market,
-            "city": extract_city_from_address(address),
-            "address": address,
-            "phone": details.get("formatted_phone_number") or details.get("international_phone_number") or "",
-            "google_rating": rating,
-            "review_count": reviews,
-            "google_listing_url": details.get("url") or "",
-            "website": website,
-            "website_status": website_scan.get("website_status"),
-            "website_loads": website_scan.get("website_loads"),
-            "is_directory_site": website_scan.get("is_directory_site"),
-            "small_business_confidence": "Low" if is_chain else "Medium",
-            "possible_chain": is_chain,
-            "contact_name": website_scan.get("contact_name"),
-            "contact_role": website_scan.get("contact_role"),
-            "contact_confidence": website_scan.get("contact_confidence"),
-            "seo_score": website_scan.get("seo_score"),
-            "business_quality_score": quality,
-            "website_opportunity_score": opportunity,
-            "lead_priority_score": priority,
-            "priority_label": label,
-            "detected_issues": website_scan.get("detected_issues", [])[:8],
-            "freshness_signals": website_scan.get("freshness_signals", [])[:5],
-            "recommended_offer": offer,
-            "outreach_opener": opener
-        }
+        candidates.append((place_id, details, is_chain))
 
-        leads.append(lead)
-        time.sleep(0.15)
+    return candidates, debug
+
+
+def iter_lead_candidates(place_batches, min_rating, min_reviews, exclude_chains, debug):
+    seen = set()
+
+    for raw_places in place_batches:
+        fresh = []
+
+        for item in raw_places:
+            place_id = item.get("place_id")
+
+            if place_id and place_id in seen:
+                continue
+
+            seen.add(place_id)
+            fresh.append(item)
+
+        selected, _ = select_lead_candidates(fresh, min_rating, min_reviews, exclude_chains, debug)
+
+        yield [(details, is_chain) for place_id, details, is_chain in selected]
+
+
+@app.route("/existing-business-leads", methods=["POST"])
+def existing_business_leads():
+    data = request.get_json(force=True)
+
+    market = (data.get("market") or "St. Petersburg, FL").strip()
+    category = (data.get("category") or "med spa").strip()
+    radius_miles = float(data.get("radius_miles") or 15)
+    min_reviews = int(data.get("min_reviews") or 20)
+    min_rating = float(data.get("min_rating") or 4.0)
+    exclude_chains = bool(data.get("exclude_chains", True))
+    tiled = bool(data.get("tiled", False))
+    pages = int(data.get("pages") or 1)
+    pages = 1 if tiled else max(1, min(pages, PLACES_MAX_PAGES))
+    max_limit = PLACES_TILE_MAX_RESULTS if tiled else PLACES_TILE_PAGE_SIZE * pages
+    limit = int(data.get("limit") or PLACES_TILE_PAGE_SIZE * pages)
+    limit = max(1, min(limit, max_limit))
+
+    if not category:
+        return jsonify({"error": "Missing category"}), 400
+
+    places_debug = new_places_debug(market, category)
+
+    try:
+        if pages > 1:
+            place_pages = iter_places_pages(market, category, radius_miles, pages, limit, places_debug)
+            place_batches = chain([next(place_pages, [])], place_pages)
+        else:
+            place_batches = [places_nearby_search(
+                market, category, radius_miles, limit=limit, tiled=tiled, debug=places_debug
+            )]
+    except Exception as e:
+        return jsonify({"error": f"Google Places search failed: {e}"}), 400
+
+    debug = new_lead_debug()
+    candidate_batches = iter_lead_candidates(place_batches, min_rating, min_reviews, exclude_chains, debug)
+    stream_format = lead_stream_format(data)
+
+    if stream_format:
+        return Response(
+            stream_leads(
+                stream_format, candidate_batches, category, market, radius_miles, debug, places_debug,
+                include_timings=timings_requested(data)
+            ),
+            mimetype=LEAD_STREAM_MIMETYPES[stream_format],
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    leads = [
+        build_lead(details, is_chain, website_scan, category, market)
+        for index, details, is_chain, website_scan in sorted(
+            pipeline_lead_scans(candidate_batches), key=lambda result: result[0]
+        )
+    ]
 
     leads.sort(key=lambda x: x.get("lead_priority_score", 0), reverse=True)
 
-    return jsonify({
+    payload = {
         "market": market,
         "category": category,
         "radius_miles": radius_miles,
         "count": len(leads),
         "debug": debug,
-        "places_debug": LAST_PLACES_DEBUG,
+        "places_debug": places_debug,
+        "leads": leads
+    }
+
+    if timings_requested(data):
+        payload["timings"] = request_timings_summary()
+
+    return jsonify(payload)
+
+
+# A sweep runs the lead search over every market x category pair as one job.
+# Sweep jobs run on their own LEAD_SWEEP_JOB_EXECUTOR, so they never hold up
+# async speed checks. Each market is geocoded once, searches run on
+# LEAD_SWEEP_EXECUTOR (shared by all sweeps, so LEAD_SWEEP_WORKERS is the
+# global cap on concurrent Places searches), places are deduped by place_id
+# and then by website URL, and each unique website is scanned once on the
+# bulk scan pool. Sweeps run at "bulk" priority, so their place details,
+# tiles and Google API calls also queue behind interactive requests.
+LEAD_SWEEP_MAX_PAIRS = max(1, int(os.environ.get("LEAD_SWEEP_MAX_PAIRS", "200")))
+LEAD_SWEEP_WORKERS = max(1, int(os.environ.get("LEAD_SWEEP_WORKERS", "4")))
+
+LEAD_SWEEP_EXECUTOR = ThreadPoolExecutor(
+    max_workers=LEAD_SWEEP_WORKERS,
+    thread_name_prefix="lead-sweep"
+)
+LEAD_SWEEP_JOB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, int(os.environ.get("LEAD_SWEEP_JOBS", "2"))),
+    thread_name_prefix="lead-sweep-job"
+)
+
+
+# Places listing the same site (host and path, ignoring scheme, "www.", the
+# query string and a trailing slash) become one lead. Directory and social
+# pages (facebook.com/<business> and the like) are never merged, since each
+# one stands for a different small business.
+def website_dedupe_key(url, place_id):
+    if not url or is_directory_or_social_site(url):
+        return place_id
+
+    parsed = urlparse(url if url.startswith(("http://", "https://")) else "https://" + url)
+    host = parsed.netloc.lower()
+
+    if host.startswith("www."):
+        host = host[4:]
+
+    return host + parsed.path.rstrip("/").lower()
+
+
+def clean_string_list(value):
+    if isinstance(value, str):
+        value = [value]
+    elif not isinstance(value, list):
+        return []
+
+    cleaned = [str(v).strip() for v in value]
+
+    return list(dict.fromkeys(v for v in cleaned if v))
+
+
+def run_lead_sweep(job_id, markets, categories, radius_miles, limit, tiled, min_reviews, min_rating, exclude_chains):
+    errors = []
+    progress = {
+        "markets_geocoded": 0,
+        "searches_done": 0,
+        "searches_total": len(markets) * len(categories),
+        "scans_done": 0,
+        "scans_total": 0
+    }
+
+    geocode_futures = {
+        submit_in_context(LEAD_SWEEP_EXECUTOR, geocode_market, market): market
+        for market in markets
+    }
+    geocoded = []
+
+    for future in as_completed(geocode_futures):
+        market = geocode_futures[future]
+
+        try:
+            future.result()
+            geocoded.append(market)
+        except Exception as e:
+            errors.append({"market": market, "error": f"Geocode failed: {e}"})
+
+        progress["markets_geocoded"] += 1
+
+    update_job(job_id, progress=progress)
+
+    pairs = [(market, category) for market in markets if market in geocoded for category in categories]
+    search_futures = {
+        submit_in_context(
+            LEAD_SWEEP_EXECUTOR, places_nearby_search, market, category, radius_miles, limit=limit, tiled=tiled
+        ): (market, category)
+        for market, category in pairs
+    }
+    pair_places = {}
+
+    for future in as_completed(search_futures):
+        market, category = search_futures[future]
+
+        try:
+            pair_places[(market, category)] = future.result()
+        except Exception as e:
+            errors.append({"market": market, "category": category, "error": f"Google Places search failed: {e}"})
+
+        progress["searches_done"] += 1
+        update_job(job_id, progress=progress)
+
+    raw_places = []
+    matches = {}
+
+    for market, category in pairs:
+        for item in pair_places.get((market, category), []):
+            place_id = item.get("place_id")
+
+            if not place_id:
+                continue
+
+            seen = matches.get(place_id)
+
+            if seen is None:
+                raw_places.append(item)
+                seen = matches[place_id] = {"markets": [], "categories": []}
+
+            if market not in seen["markets"]:
+                seen["markets"].append(market)
+            if category not in seen["categories"]:
+                seen["categories"].append(category)
+
+    selected, debug = select_lead_candidates(raw_places, min_rating, min_reviews, exclude_chains)
+    debug["raw_places_returned"] = sum(len(places) for places in pair_places.values())
+    debug["unique_places"] = len(raw_places)
+
+    by_site = {}
+
+    for place_id, details, is_chain in selected:
+        site_key = website_dedupe_key((details.get("website") or "").strip(), place_id)
+        by_site.setdefault(site_key, []).append((place_id, details, is_chain))
+
+    sites = []
+
+    for site_key, group in by_site.items():
+        group.sort(key=lambda c: int(c[1].get("user_ratings_total") or 0), reverse=True)
+        sites.append(group)
+
+    debug["duplicate_website_places"] = len(selected) - len(sites)
+
+    progress["scans_total"] = len(sites)
+    update_job(job_id, progress=progress)
+
+    scan_futures = {
+        submit_in_context(LEAD_SCAN_BULK_EXECUTOR, scan_business_website_politely, group[0][1].get("website") or ""): group
+        for group in sites
+    }
+    leads = []
+
+    for future in as_completed(scan_futures):
+        group = scan_futures[future]
+        place_id, details, is_chain = group[0]
+        match = matches[place_id]
+
+        lead = build_lead(details, is_chain, future.result(), match["categories"][0], match["markets"][0])
+        lead["place_id"] = place_id
+        lead["matched_markets"] = match["markets"]
+        lead["matched_categories"] = match["categories"]
+        lead["other_place_ids"] = [other[0] for other in group[1:]]
+        leads.append(lead)
+
+        progress["scans_done"] += 1
+
+        if progress["scans_done"] % 10 == 0:
+            update_job(job_id, progress=progress)
+
+    leads.sort(key=lambda x: x.get("lead_priority_score", 0), reverse=True)
+
+    return {
+        "markets": markets,
+        "categories": categories,
+        "radius_miles": radius_miles,
+        "count": len(leads),
+        "debug": debug,
+        "errors": errors,
         "leads": leads
-    })
+    }, progress
+
+
+def run_lead_sweep_job(job_id, *args):
+    update_job(job_id, status="running")
+    priority = REQUEST_PRIORITY.set("bulk")
+
+    try:
+        result, progress = run_lead_sweep(job_id, *args)
+        update_job(job_id, status="done", progress=progress, result=result)
+    except Exception as e:
+        print("Lead sweep job failed:", e, flush=True)
+        update_job(job_id, status="failed", result={"error": str(e)})
+    finally:
+        REQUEST_PRIORITY.reset(priority)
+
+
+@app.route("/lead-sweep", methods=["POST"])
+@limiter.limit("20 per day; 5 per hour")
+def lead_sweep():
+    data = request.get_json(force=True)
+
+    markets = clean_string_list(data.get("markets"))
+    categories = clean_string_list(data.get("categories"))
+    radius_miles = float(data.get("radius_miles") or 15)
+    min_reviews = int(data.get("min_reviews") or 20)
+    min_rating = float(data.get("min_rating") or 4.0)
+    exclude_chains = bool(data.get("exclude_chains", True))
+    tiled = bool(data.get("tiled", False))
+    max_limit = PLACES_TILE_MAX_RESULTS if tiled else 20
+    limit = int(data.get("limit") or 20)
+    limit = max(1, min(limit, max_limit))
+
+    unique_markets = {}
+
+    for market in markets:
+        unique_markets.setdefault(normalize_market(market), market)
+
+    markets = [market for key, market in unique_markets.items() if key]
+
+    if not markets:
+        return jsonify({"error": "Missing markets"}), 400
+
+    if not categories:
+        return jsonify({"error": "Missing categories"}), 400
+
+    if len(markets) * len(categories) > LEAD_SWEEP_MAX_PAIRS:
+        return jsonify({"error": f"Too many market/category pairs (max {LEAD_SWEEP_MAX_PAIRS})"}), 400
+
+    job = create_job("lead-sweep", markets=markets, categories=categories, progress={}, result=None)
+    LEAD_SWEEP_JOB_EXECUTOR.submit(
+        run_lead_sweep_job, job["job_id"], markets, categories,
+        radius_miles, limit, tiled, min_reviews, min_rating, exclude_chains
+    )
+
+    return jsonify({
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "status_url": f"/lead-sweep/{job['job_id']}"
+    }), 202
+
+
+@app.route("/lead-sweep/<job_id>", methods=["GET"])
+@limiter.exempt
+def lead_sweep_status(job_id):
+    job = load_job(job_id, "lead-sweep")
+
+    if not job:
+        return jsonify({"error": "Unknown or expired lead sweep job"}), 404
+
+    return jsonify(job)
 
 
 # ---------- Lead capture ----------
@@ -1020,7 +3444,8 @@ def lead():
 
     if brevo_api_key:
         try:
-            resp = requests.post(
+            resp = http_request(
+                "POST",
                 "https://api.brevo.com/v3/smtp/email",
                 headers={
                     "accept": "application/json",
@@ -1038,7 +3463,6 @@ def lead():
                         <strong>Message:</strong> {message or '(none)'}<br/></p>
                     """,
                 },
-                timeout=TIMEOUT,
             )
 
             if resp.status_code >= 300:
@@ -1068,6 +3492,27 @@ def normalize_speed_url(url):
     return value
 
 
+def canonical_speed_url(url):
+    parsed = urlparse(normalize_speed_url(url))
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+
+    try:
+        port = parsed.port
+        host = (parsed.hostname or "").lower()
+
+        if port is None or (scheme, port) in (("http", 80), ("https", 443)):
+            netloc = host
+        else:
+            netloc = f"{host}:{port}"
+    except ValueError:
+        pass
+
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+
+    return urlunparse((scheme, netloc, parsed.path or "/", "", query, ""))
+
+
 def safe_score(category):
     try:
         score = category.get("score")
@@ -1740,56 +4185,150 @@ def run_pagespeed(url, strategy):
     if key:
         params["key"] = key
 
-    response = requests.get(
+    response = http_request(
+        "GET",
         "https://www.googleapis.com/pagespeedonline/v5/runPagespeed",
         params=params,
-        timeout=75
+        read_timeout=75,
+        status_retries=False
     )
 
     response.raise_for_status()
 
     return response.json()
 
-@app.errorhandler(429)
-def ratelimit_handler(e):
-    return jsonify({
-        "error": "Free fair-use limit reached.",
-        "message": "Divi Dojo Speed Analyzer is free to use. Each visitor can run up to 5 speed checks per hour and 20 speed checks per day so the tool stays available for everyone. Please try again later, or contact Divi Dojo if you need help reviewing your website speed."
-    }), 429
-    
-@app.route("/speed-check", methods=["POST"])
-@limiter.limit("20 per day; 5 per hour")
-def speed_check():
-    data = request.get_json(force=True)
-    url = normalize_speed_url(data.get("url"))
 
-    if not url:
-        return jsonify({"error": "Missing URL"}), 400
+# Desktop and mobile run side by side, so a check takes as long as the slower
+# strategy rather than the sum. PAGESPEED_DEADLINE bounds the whole check.
+PAGESPEED_STRATEGIES = ["desktop", "mobile"]
+PAGESPEED_DEADLINE = float(os.environ.get("PAGESPEED_DEADLINE", "80"))
+
+PAGESPEED_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(2, int(os.environ.get("PAGESPEED_WORKERS", "4"))),
+    thread_name_prefix="pagespeed"
+)
+
+
+# Parsed reports are cached on disk per canonical URL and strategy, so a
+# re-run of the same page within PAGESPEED_CACHE_TTL is served instantly.
+PAGESPEED_CACHE_TTL = float(os.environ.get("PAGESPEED_CACHE_TTL", str(6 * 3600)))
+PAGESPEED_CACHE_MAX = int(os.environ.get("PAGESPEED_CACHE_MAX", "1000"))
+
+
+def pagespeed_cache_key(url, strategy):
+    return f"{strategy} {canonical_speed_url(url)}"
+
+
+def pagespeed_report(url, strategy):
+    with stage_timer(f"pagespeed_{strategy}"):
+        raw = run_pagespeed(url, strategy)
+
+    with stage_timer("pagespeed_parse"):
+        report = parse_pagespeed_result(raw, strategy)
+
+    disk_cache_set(
+        "pagespeed",
+        pagespeed_cache_key(url, strategy),
+        report,
+        max_entries=PAGESPEED_CACHE_MAX
+    )
+
+    return report
+
+
+def pagespeed_cached(url, strategies=None):
+    return all(
+        disk_cache_has("pagespeed", pagespeed_cache_key(url, strategy), max_age=PAGESPEED_CACHE_TTL)
+        for strategy in strategies or PAGESPEED_STRATEGIES
+    )
+
+
+def pagespeed_error_text(e):
+    if isinstance(e, requests.exceptions.HTTPError):
+        status_code = e.response.status_code if e.response is not None else "unknown"
+        response_text = e.response.text[:1200] if e.response is not None else ""
+        return f"HTTP {status_code}: {response_text}"
+
+    return str(e)
+
+
+def run_pagespeed_strategies(url, strategies=None, deadline=None, force_refresh=False, on_result=None):
+    strategies = strategies or PAGESPEED_STRATEGIES
+    deadline = PAGESPEED_DEADLINE if deadline is None else deadline
 
     results = {}
     errors = {}
+    futures = {}
 
-    for strategy in ["desktop", "mobile"]:
-        try:
-            raw = run_pagespeed(url, strategy)
-            results[strategy] = parse_pagespeed_result(raw, strategy)
+    def record(strategy, report=None, error=None):
+        if error is None:
+            results[strategy] = report
+        else:
+            errors[strategy] = error
+            print(f"PageSpeed {strategy} error:", error, flush=True)
 
-        except requests.exceptions.HTTPError as e:
-            status_code = e.response.status_code if e.response is not None else "unknown"
-            response_text = e.response.text[:1200] if e.response is not None else ""
-            errors[strategy] = f"HTTP {status_code}: {response_text}"
-            print(f"PageSpeed {strategy} error:", errors[strategy], flush=True)
+        if on_result:
+            on_result(strategy, report, error)
 
+    def record_future(future, strategy):
+        try:
+            record(strategy, dict(future.result(), cached=False, report_age_seconds=0))
         except Exception as e:
-            errors[strategy] = str(e)
-            print(f"PageSpeed {strategy} error:", errors[strategy], flush=True)
+            record(strategy, error=pagespeed_error_text(e))
+
+    for strategy in strategies:
+        if not force_refresh:
+            cached, age = disk_cache_get(
+                "pagespeed",
+                pagespeed_cache_key(url, strategy),
+                max_age=PAGESPEED_CACHE_TTL
+            )
+
+            if cached is not None:
+                cached["cached"] = True
+                cached["report_age_seconds"] = int(age)
+                record(strategy, cached)
+                continue
+
+        futures[submit_in_context(PAGESPEED_EXECUTOR, pagespeed_report, url, strategy)] = strategy
+
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            record_future(future, futures[future])
+
+    except FuturesTimeoutError:
+        # Futures that finished after the deadline but before this loop
+        # still report their result or error.
+        for future, strategy in futures.items():
+            if strategy in results or strategy in errors:
+                continue
+
+            if future.done():
+                record_future(future, strategy)
+            else:
+                future.cancel()
+                record(strategy, error=f"Timed out after {deadline:g}s")
 
+    return {strategy: results[strategy] for strategy in strategies if strategy in results}, errors
+
+
+def speed_check_served_from_cache():
+    data = request.get_json(force=True, silent=True) or {}
+    url = normalize_speed_url(data.get("url"))
+
+    if not url or data.get("force_refresh"):
+        return False
+
+    return pagespeed_cached(url)
+
+
+def build_speed_check_payload(url, results, errors):
     if not results:
-        return jsonify({
+        return {
             "error": "Speed check failed for desktop and mobile.",
             "details": errors,
             "hint": "Check whether PageSpeed Insights API is enabled and whether PAGESPEED_API_KEY is valid/restricted correctly."
-        }), 400
+        }, 400
 
     mobile_score = results.get("mobile", {}).get("performance")
     desktop_score = results.get("desktop", {}).get("performance")
@@ -1801,13 +4340,86 @@ def speed_check():
 
     recommendation = build_speed_recommendation(mobile_score, desktop_score, all_findings)
 
-    return jsonify({
+    return {
         "url": url,
         "desktop": results.get("desktop"),
         "mobile": results.get("mobile"),
         "errors": errors,
         "recommendation": recommendation
-    })
+    }, 200
+
+
+def run_speed_check_job(job_id, url, force_refresh):
+    update_job(job_id, status="running")
+
+    def on_result(strategy, report, error):
+        with JOB_LOCK:
+            job = load_job(job_id)
+
+            if not job:
+                return
+
+            if error is None:
+                job["partial"][strategy] = report
+            else:
+                job["errors"][strategy] = error
+
+            save_job(job)
+
+    try:
+        results, errors = run_pagespeed_strategies(url, force_refresh=force_refresh, on_result=on_result)
+        payload, status = build_speed_check_payload(url, results, errors)
+        update_job(job_id, status="done" if status == 200 else "failed", result=payload)
+    except Exception as e:
+        print("Speed check job failed:", e, flush=True)
+        update_job(job_id, status="failed", result={"error": str(e)})
+
+
+@app.errorhandler(429)
+def ratelimit_handler(e):
+    return jsonify({
+        "error": "Free fair-use limit reached.",
+        "message": "Divi Dojo Speed Analyzer is free to use. Each visitor can run up to 5 speed checks per hour and 20 speed checks per day so the tool stays available for everyone. Please try again later, or contact Divi Dojo if you need help reviewing your website speed."
+    }), 429
+    
+@app.route("/speed-check", methods=["POST"])
+@limiter.limit("20 per day; 5 per hour", exempt_when=speed_check_served_from_cache)
+def speed_check():
+    data = request.get_json(force=True)
+    url = normalize_speed_url(data.get("url"))
+    force_refresh = bool(data.get("force_refresh", False))
+
+    if not url:
+        return jsonify({"error": "Missing URL"}), 400
+
+    if data.get("async"):
+        job = create_job("speed-check", url=url, partial={}, errors={}, result=None)
+        JOB_EXECUTOR.submit(run_speed_check_job, job["job_id"], url, force_refresh)
+
+        return jsonify({
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "status_url": f"/speed-check/{job['job_id']}"
+        }), 202
+
+    results, errors = run_pagespeed_strategies(url, force_refresh=force_refresh)
+    payload, status = build_speed_check_payload(url, results, errors)
+
+    if timings_requested(data):
+        payload["timings"] = request_timings_summary()
+
+    return jsonify(payload), status
+
+
+@app.route("/speed-check/<job_id>", methods=["GET"])
+@limiter.exempt
+def speed_check_status(job_id):
+    job = load_job(job_id, "speed-check")
+
+    if not job:
+        return jsonify({"error": "Unknown or expired speed check job"}), 404
+
+    return jsonify(job)
 
 
 if __name__ == "__main__":
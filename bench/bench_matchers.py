@@ -0,0 +1,109 @@
+"""Compare compiled chain/directory matching with the old linear scans.
+
+Run from the repository root:
+
+    python bench/bench_matchers.py
+    python bench/bench_matchers.py --sizes 100 10000 50000 --lookups 2000
+
+Synthetic brand names and directory hosts are generated for each list
+size; per-lookup cost of the compiled matchers should stay flat while the
+linear scans grow with the list.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import (  # noqa: E402
+    CHAIN_HINTS,
+    DIRECTORY_DOMAINS,
+    KeywordMatcher,
+    build_domain_index,
+    host_in_domain_index,
+)
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "to", "vi", "zen", "bor", "dal", "fin"]
+SUFFIXES = [" fitness", " dental", " pizza", " auto", " salon", " bank", " grill", ""]
+
+
+def brand_names(count, rng):
+    names = set(CHAIN_HINTS)
+
+    while len(names) < count:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        names.add(word + rng.choice(SUFFIXES))
+
+    return sorted(names)
+
+
+def directory_hosts(count, rng):
+    hosts = set(DIRECTORY_DOMAINS)
+
+    while len(hosts) < count:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        hosts.add(word + rng.choice([".com", ".site", ".net", ".io"]))
+
+    return sorted(hosts)
+
+
+def lookup_samples(count, rng):
+    samples = []
+
+    for i in range(count):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(3)).title()
+        samples.append((
+            f"{name} family practice https://www.{name.lower()}.com/ "
+            f"{rng.randint(100, 9999)} central ave, st. petersburg, fl 33701",
+            f"{'www.' if i % 2 else 'book.'}{name.lower()}.{rng.choice(['com', 'site', 'net'])}"
+        ))
+
+    return samples
+
+
+def per_lookup_us(fn, samples):
+    started = time.perf_counter()
+
+    for sample in samples:
+        fn(sample)
+
+    return (time.perf_counter() - started) / len(samples) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[50, 1000, 10000, 50000])
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    samples = lookup_samples(args.lookups, rng)
+
+    print(f"{'entries':>8} {'chain linear':>13} {'chain compiled':>15} {'dir linear':>11} {'dir index':>10}")
+
+    for size in args.sizes:
+        hints = brand_names(size, rng)
+        domains = directory_hosts(size, rng)
+
+        build_started = time.perf_counter()
+        matcher = KeywordMatcher(hints)
+        index = build_domain_index(domains)
+        build_ms = (time.perf_counter() - build_started) * 1000
+
+        chain_linear = per_lookup_us(lambda s: any(h in s[0] for h in hints), samples)
+        chain_compiled = per_lookup_us(lambda s: matcher.search(s[0]), samples)
+        dir_linear = per_lookup_us(lambda s: any(d in s[1] for d in domains), samples)
+        dir_index = per_lookup_us(lambda s: host_in_domain_index(s[1], index), samples)
+
+        print(
+            f"{size:>8} {chain_linear:>11.1f}us {chain_compiled:>13.1f}us "
+            f"{dir_linear:>9.1f}us {dir_index:>8.1f}us   (build {build_ms:.0f}ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
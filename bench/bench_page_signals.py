@@ -0,0 +1,224 @@
+"""Compare the single-pass page signal extractor with the old BeautifulSoup walk.
+
+Run from the repository root:
+
+    python bench/bench_page_signals.py
+    python bench/bench_page_signals.py --sections 2000 --repeat 3
+    python bench/bench_page_signals.py --check
+
+--check compares the extracted values with the legacy walk on the fixture
+pages, the generated pages and a few nesting edge cases, and exits non-zero
+on any mismatch.
+
+The legacy column needs beautifulsoup4 installed; without it only the
+single-pass timings are reported.
+"""
+
+import argparse
+import gzip
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import extract_page_signals  # noqa: E402
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+
+SECTION = """
+<div class="et_pb_section et_pb_section_{i} et_section_regular">
+  <div class="et_pb_row et_pb_row_{i}">
+    <div class="et_pb_column et_pb_column_1_2">
+      <div class="et_pb_module et_pb_text et_pb_text_{i}">
+        <div class="et_pb_text_inner">
+          <h2>Service {i}</h2>
+          <p>Our team has served the community for years. Call now to schedule
+          an appointment or request a quote. We offer <strong>same-day</strong>
+          service and friendly staff at every visit.</p>
+        </div>
+      </div>
+      <img src="/wp-content/uploads/2021/0{m}/photo-{i}.jpg" alt="{alt}" width="800" height="600">
+      <a href="/contact/" class="et_pb_button">Contact us</a>
+    </div>
+  </div>
+  <script>window.etData_{i} = {{"id": {i}, "lazy": true, "delay": 300}};</script>
+  <style>.et_pb_section_{i} {{ background: #fff; padding: 4% 0; }}</style>
+</div>
+"""
+
+
+def build_page(sections):
+    body = "".join(
+        SECTION.format(i=i, m=(i % 9) + 1, alt="" if i % 3 else f"Photo {i}")
+        for i in range(sections)
+    )
+
+    return (
+        "<!DOCTYPE html><html><head><title>Sunshine Dental | St. Petersburg</title>"
+        '<meta name="description" content="Family dentist in St. Petersburg.">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        '<link rel="canonical" href="https://example.com/">'
+        '<script type="application/ld+json">{"@type": "Dentist"}</script>'
+        "</head><body><h1>Sunshine Dental</h1>"
+        f"{body}"
+        '<footer><a href="tel:+17275550100">Call</a> '
+        '<a href="mailto:hello@example.com">Email</a> '
+        "&copy; 2024 Sunshine Dental. Owner: Maria Lopez</footer>"
+        "</body></html>"
+    )
+
+
+def legacy_signals(html):
+    soup = BeautifulSoup(html, "html.parser")
+
+    title = (soup.title.string or "").strip() if soup.title and soup.title.string else ""
+    md = soup.find("meta", attrs={"name": "description"})
+    description = (md.get("content") or "").strip() if md else ""
+    h1_tags = [h.get_text(strip=True) for h in soup.find_all("h1")]
+    viewport = soup.find("meta", attrs={"name": "viewport"})
+    canonical = soup.find("link", attrs={"rel": "canonical"})
+    schema_scripts = soup.find_all("script", attrs={"type": "application/ld+json"})
+    imgs = soup.find_all("img")
+    imgs_without_alt = sum(1 for im in imgs if not (im.get("alt") or "").strip())
+
+    for t in soup(["script", "style", "noscript"]):
+        t.extract()
+
+    text = soup.get_text(separator=" ")
+    words = [w for w in text.split() if w.isalpha() or any(c.isalnum() for c in w)]
+    tel_links = soup.find_all("a", href=lambda h: h and h.lower().startswith("tel:"))
+    mail_links = soup.find_all("a", href=lambda h: h and h.lower().startswith("mailto:"))
+    contact_text = soup.get_text(" ", strip=True)
+    re.search(r"(?:Owner|Founder)\s*[:\-]\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,2})", contact_text)
+
+    return (
+        title, description, h1_tags, viewport, canonical, schema_scripts,
+        imgs_without_alt, len(words), tel_links, mail_links
+    )
+
+
+PARITY_SNIPPETS = [
+    "<h1>Hello<script>var x=1</script> World</h1>",
+    "<h1>A<style>.a{}</style>B<noscript>NS</noscript></h1><template><p>T</p></template>",
+    "<title>Shop</title><h1>One<h1>Two</h1></h1><p>Call <a href='tel:555'>us</a></p>",
+    "<div><h1>Open <b>bold</div> tail</h1><a href='mailto:a@b.c'>mail</a>",
+    "<meta name='description' content=' First '><meta name='description' content='Second'>",
+]
+
+FIXTURE_PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pages")
+
+
+def comparable_signals(html):
+    signals = extract_page_signals(html)
+
+    return (
+        signals["title"], signals["description"] or "", signals["h1_tags"], signals["viewport"],
+        signals["canonical"], signals["schema_scripts"], signals["imgs_without_alt"],
+        signals["word_count"], signals["tel_links"], signals["mail_links"]
+    )
+
+
+def comparable_legacy(html):
+    (
+        title, description, h1_tags, viewport, canonical, schema_scripts,
+        imgs_without_alt, word_count, tel_links, mail_links
+    ) = legacy_signals(html)
+
+    return (
+        title, description, h1_tags, bool(viewport), bool(canonical), len(schema_scripts),
+        imgs_without_alt, word_count, len(tel_links), len(mail_links)
+    )
+
+
+def parity_cases():
+    for name in sorted(os.listdir(FIXTURE_PAGES)):
+        path = os.path.join(FIXTURE_PAGES, name)
+        opener = gzip.open if name.endswith(".gz") else open
+
+        with opener(path, "rb") as f:
+            yield name, f.read().decode("utf-8", errors="replace")
+
+    for sections in (1, 20):
+        yield f"build_page({sections})", build_page(sections)
+
+    for index, snippet in enumerate(PARITY_SNIPPETS):
+        yield f"snippet[{index}]", snippet
+
+
+def check_parity():
+    if BeautifulSoup is None:
+        print("beautifulsoup4 is not installed; cannot check parity")
+        return 2
+
+    fields = (
+        "title", "description", "h1_tags", "viewport", "canonical", "schema_scripts",
+        "imgs_without_alt", "word_count", "tel_links", "mail_links"
+    )
+    failures = 0
+
+    for name, html in parity_cases():
+        new = comparable_signals(html)
+        old = comparable_legacy(html)
+        diffs = [(field, a, b) for field, a, b in zip(fields, new, old) if a != b]
+
+        if diffs:
+            failures += 1
+
+            for field, a, b in diffs:
+                print(f"MISMATCH {name} {field}: single-pass={a!r} legacy={b!r}")
+        else:
+            print(f"ok       {name}")
+
+    return 1 if failures else 0
+
+
+def best_of(fn, html, repeat):
+    best = None
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(html)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, nargs="*", default=[20, 200, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="compare extracted values with the legacy walk")
+    args = parser.parse_args()
+
+    if args.check:
+        return check_parity()
+
+    print(f"{'sections':>8} {'size':>10} {'single-pass':>12} {'legacy':>10} {'speedup':>8}")
+
+    for sections in args.sections:
+        html = build_page(sections)
+        new_time = best_of(extract_page_signals, html, args.repeat)
+
+        if BeautifulSoup is None:
+            legacy_text = "n/a"
+            speedup_text = "n/a"
+        else:
+            legacy_time = best_of(legacy_signals, html, args.repeat)
+            legacy_text = f"{legacy_time * 1000:.1f}ms"
+            speedup_text = f"{legacy_time / new_time:.1f}x"
+
+        print(
+            f"{sections:>8} {len(html) / 1024:>8.0f}KB "
+            f"{new_time * 1000:>10.1f}ms {legacy_text:>10} {speedup_text:>8}"
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
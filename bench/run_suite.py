@@ -0,0 +1,205 @@
+"""Offline benchmark suite for the SEO analyzer API.
+
+Runs analyze(), scan_business_website(), parse_pagespeed_result() and the
+full /existing-business-leads flow against recorded fixtures served by a
+local stub server, so no network access or API keys are needed. Results
+are compared with bench/baseline.json and any benchmark whose median
+latency grew by more than --tolerance is reported as a regression (exit
+status 1).
+
+Run from the repository root:
+
+    python bench/run_suite.py
+    python bench/run_suite.py --only analyze scan --iterations 50
+    python bench/run_suite.py --update-baseline
+
+Baselines are machine-specific; record one on the machine you compare on.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+# Caches are disabled so every iteration exercises the full cold path.
+os.environ.update({
+    "GOOGLE_PLACES_API_KEY": "bench",
+    "PAGESPEED_API_KEY": "bench",
+    "CACHE_DB_PATH": os.path.join(tempfile.mkdtemp(prefix="seo-bench-"), "cache.sqlite3"),
+    "GEOCODE_CACHE_TTL": "0",
+    "PLACES_CACHE_FRESH": "0",
+    "PLACES_CACHE_STALE": "0",
+    "PLACE_DETAILS_CACHE_TTL": "0",
+    "SITE_SCAN_CACHE_TTL": "0",
+    "SITE_PROBE_TTL": "0",
+    "PAGESPEED_CACHE_TTL": "0",
+    # The bench is one process, so it gets the whole Google quota.
+    "GOOGLE_QUOTA_WORKERS": "1",
+})
+
+import app  # noqa: E402
+from stub_server import StubRoutingAdapter, StubUpstream, load_fixture_json  # noqa: E402
+
+PAGES = {
+    "small": "http://gulfcoast-plumbing.bench.test/",
+    "typical": "http://bayfront-dental.bench.test/",
+    "huge": "http://sunshine-medspa.bench.test/",
+}
+
+
+def build_benchmarks(client):
+    benchmarks = []
+
+    for size, url in PAGES.items():
+        def analyze_page(url=url):
+            response = client.post("/analyze", json={"url": url, "keyword": "dentist"})
+            assert response.status_code == 200, response.get_data(as_text=True)
+
+        def scan_page(url=url):
+            result = app.scan_business_website(url)
+            assert result["website_loads"], result
+
+        benchmarks.append((f"analyze[{size}]", "analyze", analyze_page, 1))
+        benchmarks.append((f"scan_business_website[{size}]", "scan", scan_page, 1))
+
+    for strategy in ("desktop", "mobile"):
+        raw = load_fixture_json(f"pagespeed_{strategy}.json")
+
+        def parse_report(raw=raw, strategy=strategy):
+            app.parse_pagespeed_result(raw, strategy)
+
+        benchmarks.append((f"parse_pagespeed_result[{strategy}]", "pagespeed", parse_report, 1))
+
+    def lead_flow():
+        response = client.post("/existing-business-leads", json={
+            "market": "St. Petersburg, FL",
+            "category": "dentist",
+            "min_reviews": 20,
+            "min_rating": 4.0
+        })
+        assert response.status_code == 200, response.get_data(as_text=True)
+        assert response.get_json()["count"] > 0
+
+    benchmarks.append(("existing_business_leads", "leads", lead_flow, 0.25))
+
+    return benchmarks
+
+
+def measure(fn, iterations, warmup):
+    for _ in range(warmup):
+        fn()
+
+    latencies = []
+    started = time.perf_counter()
+
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "ops_per_sec": round(iterations / elapsed, 2) if elapsed else 0.0
+    }
+
+
+def load_baseline():
+    try:
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            return json.load(f).get("benchmarks", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20, help="iterations per benchmark (flow benchmarks run a quarter as many)")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=20, help="simulated upstream latency per stub response")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown before a regression is reported")
+    parser.add_argument("--only", nargs="*", default=None, help="benchmark groups to run: analyze scan pagespeed leads")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    stub = StubUpstream(latency_ms=args.latency_ms).start()
+    app.HTTP_ADAPTER = StubRoutingAdapter(stub.base_url, pool_connections=32, pool_maxsize=32)
+    app.HTTP_ADAPTER_NO_STATUS_RETRY = app.HTTP_ADAPTER
+    app.limiter.enabled = False
+    client = app.app.test_client()
+
+    baseline = load_baseline()
+    results = {}
+    regressions = []
+
+    try:
+        for name, group, fn, scale in build_benchmarks(client):
+            if args.only and group not in args.only:
+                continue
+
+            iterations = max(3, int(args.iterations * scale))
+            result = measure(fn, iterations, args.warmup)
+            results[name] = result
+
+            previous = baseline.get(name)
+
+            if previous and previous.get("p50_ms"):
+                result["vs_baseline"] = round(result["p50_ms"] / previous["p50_ms"], 3)
+
+                if result["vs_baseline"] > 1 + args.tolerance:
+                    regressions.append(name)
+    finally:
+        stub.stop()
+
+    if args.json:
+        print(json.dumps({"benchmarks": results, "regressions": regressions}, indent=2))
+    else:
+        print(f"stub latency {args.latency_ms:g}ms, {stub.requests} upstream requests served")
+        print(f"{'benchmark':<38} {'p50':>10} {'p95':>10} {'ops/s':>9} {'vs base':>8}")
+
+        for name, result in results.items():
+            ratio = f"{result['vs_baseline']:.2f}x" if "vs_baseline" in result else "-"
+            flag = "  REGRESSION" if name in regressions else ""
+            print(
+                f"{name:<38} {result['p50_ms']:>8.1f}ms {result['p95_ms']:>8.1f}ms "
+                f"{result['ops_per_sec']:>9.2f} {ratio:>8}{flag}"
+            )
+
+    if args.update_baseline:
+        merged = dict(baseline)
+
+        for name, result in results.items():
+            merged[name] = {key: value for key, value in result.items() if key != "vs_baseline"}
+
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({
+                "recorded_at": time.strftime("%Y-%m-%d"),
+                "python": platform.python_version(),
+                "latency_ms": args.latency_ms,
+                "benchmarks": merged
+            }, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
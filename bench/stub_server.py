@@ -0,0 +1,163 @@
+"""Local stand-in for Google APIs and lead websites used by the benchmark suite.
+
+Every outbound request the app makes is rewritten by StubRoutingAdapter to
+http://127.0.0.1:<port>/<original-host><original-path>, and StubUpstream
+answers from the recorded fixtures in bench/fixtures. Lead websites use
+*.bench.test hosts listed in fixtures/sites.json, so per-host limits in the
+app behave as they would against real, distinct sites.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from requests.adapters import HTTPAdapter
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+GOOGLE_ROUTES = {
+    ("maps.googleapis.com", "/maps/api/geocode/json"): "geocode.json",
+    ("places.googleapis.com", "/v1/places:searchText"): "places_search_text.json",
+    ("maps.googleapis.com", "/maps/api/place/textsearch/json"): "places_legacy_textsearch.json",
+    ("maps.googleapis.com", "/maps/api/place/details/json"): "place_details.json",
+}
+
+PAGESPEED_ROUTE = ("www.googleapis.com", "/pagespeedonline/v5/runPagespeed")
+
+
+def load_fixture_bytes(*parts):
+    path = os.path.join(FIXTURES_DIR, *parts)
+
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            return f.read()
+
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def load_fixture_json(name):
+    return json.loads(load_fixture_bytes(name))
+
+
+class StubUpstream:
+    def __init__(self, latency_ms=0):
+        self.latency = latency_ms / 1000.0
+        self.sites = load_fixture_json("sites.json")
+        self.pages = {}
+        self.requests = 0
+        self.requests_lock = threading.Lock()
+
+        for site in self.sites.values():
+            page = site.get("page")
+
+            if page and page not in self.pages:
+                self.pages[page] = load_fixture_bytes("pages", page)
+
+        self.google = {route: load_fixture_bytes(name) for route, name in GOOGLE_ROUTES.items()}
+        self.pagespeed = {
+            strategy: load_fixture_bytes(f"pagespeed_{strategy}.json")
+            for strategy in ("desktop", "mobile")
+        }
+        self.server = None
+        self.base_url = ""
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                stub.handle(self, send_body=True)
+
+            def do_HEAD(self):
+                stub.handle(self, send_body=False)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                stub.handle(self, send_body=True)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def handle(self, handler, send_body):
+        with self.requests_lock:
+            self.requests += 1
+
+        parsed = urlparse(handler.path)
+        host, _, path = parsed.path.lstrip("/").partition("/")
+        path = "/" + path
+        status, content_type, body, latency = self.route(host, path, parse_qs(parsed.query))
+
+        if latency:
+            time.sleep(latency)
+
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+
+        if send_body:
+            handler.wfile.write(body)
+
+    def route(self, host, path, query):
+        if (host, path) in self.google:
+            return 200, "application/json", self.google[(host, path)], self.latency
+
+        if (host, path) == PAGESPEED_ROUTE:
+            strategy = (query.get("strategy") or ["mobile"])[0]
+            return 200, "application/json", self.pagespeed.get(strategy, self.pagespeed["mobile"]), self.latency
+
+        site = self.sites.get(host)
+
+        if site is None:
+            return 404, "text/plain", b"not found", self.latency
+
+        latency = self.latency + site.get("latency_ms", 0) / 1000.0
+
+        if site.get("status", 200) != 200:
+            return site["status"], "text/plain", b"unavailable", latency
+
+        if path == "/robots.txt":
+            return (200, "text/plain", b"User-agent: *\nAllow: /\n", latency) if site.get("robots") else (404, "text/plain", b"", latency)
+
+        if path == "/sitemap.xml":
+            return (200, "application/xml", b"<urlset/>", latency) if site.get("sitemap") else (404, "text/plain", b"", latency)
+
+        return 200, "text/html; charset=utf-8", self.pages[site["page"]], latency
+
+
+class StubRoutingAdapter(HTTPAdapter):
+    def __init__(self, base_url, **kwargs):
+        self.base_url = base_url
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        parsed = urlparse(request.url)
+
+        if not request.url.startswith(self.base_url):
+            request.url = f"{self.base_url}/{parsed.netloc}{parsed.path or '/'}"
+
+            if parsed.query:
+                request.url += "?" + parsed.query
+
+        return super().send(request, **kwargs)